@@ -12,7 +12,10 @@ setuptools.setup(
         'tests': [
             'pytest~=6.2',
             'coverage~=5.5',
-            'pytest-mongo~=2.1',
+            'filelock~=3.0',
+            'pytest-xdist~=2.4',
+            'docker~=5.0',
+            'time-machine~=2.4',
         ],
         'mongo-asb': [
             'pymongo~=3.12',
@@ -207,6 +207,29 @@ class AppStateBackend(abc.ABC):
         """
         raise NotImplementedError() # pragma: no cover
 
+    def get_state(self) -> T.Tuple[
+        T.Union[None, T.Tuple[str, str]],
+        semver.Version,
+        semver.Version,
+    ]:
+        """
+        Read the registered inconsistency along with the current and target
+        version of the schema.
+
+        This allows SVIP to get all the information it needs before a check or
+        a migration with a single call. The default implementation simply calls
+        `get_inconsistency()` and `get_version()`. Back ends that can read all
+        of that information at once (e.g. with a single query) are encouraged
+        to override this method.
+
+        :returns: a 3-element tuple containing the value that would be returned
+          by `get_inconsistency()`, the current version and the target
+          version, respectively.
+        """
+        inconsistency = self.get_inconsistency()
+        current, target = self.get_version()
+        return inconsistency, current, target
+
     def get_version_history(self) -> T.List[T.Tuple[semver.Version, datetime.datetime]]:
         """
         Return the history of updates in the schema version as a list.
@@ -364,6 +364,24 @@ class MongoASB(appstate.AppStateBackend):
             target = semver.Version(data['target_version'])
         return current, target
 
+    def get_state(self) -> T.Tuple[
+        T.Union[None, T.Tuple[str, str]],
+        semver.Version,
+        semver.Version,
+    ]:
+        data = self.__coll.find_one(
+            'svip_versioning',
+            {'inconsistency': 1, 'current_version': 1, 'target_version': 1},
+        )
+        inconsistency = None
+        if data['inconsistency']:
+            inconsistency = tuple(data['inconsistency'])
+        current = semver.Version(data['current_version'])
+        target = None
+        if data['target_version']:
+            target = semver.Version(data['target_version'])
+        return inconsistency, current, target
+
     def register_inconsistency(self, info: str, backup_info: str = None):
         r = self.__coll.update_one(
             {'_id': 'svip_versioning'},
@@ -114,6 +114,31 @@ class SqliteASB(appstate.AppStateBackend):
             target = semver.Version(t[1]) if t[1] else None
             return current, target
 
+    def get_state(self) -> T.Tuple[
+        T.Union[None, T.Tuple[str, str]],
+        semver.Version,
+        semver.Version,
+    ]:
+        with self.__transaction() as cur:
+            if not self.__versioning_table_exists(cur):
+                return None, semver.Version("0.0.0"), None
+
+            res = cur.execute(
+                f"""
+                SELECT
+                    inconsistency_info,
+                    inconsistency_backup_info,
+                    current_version,
+                    target_version
+                FROM `{self.__conf.versioning_table}`
+                """
+            )
+            t = res.fetchone()
+            inconsistency = t[:2] if t[0] else None
+            current = semver.Version(t[2])
+            target = semver.Version(t[3]) if t[3] else None
+            return inconsistency, current, target
+
     def register_inconsistency(self, info: str, backup_info: str = None):
         with self.__transaction() as cur:
             self.__ensure_versioning_table(cur)
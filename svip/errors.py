@@ -20,7 +20,13 @@ class BackupFailedError(ErrorBase):
 
 
 class IncompatibleVersionError(ErrorBase):
-    pass
+    def __init__(self, spec, current):
+        super().__init__(spec, current)
+        self.spec = spec
+        self.current = current
+
+    def __str__(self):
+        return f'version spec {self.spec} is incompatible with current schema version {self.current}'
 
 
 class InconsistentStateError(ErrorBase):
@@ -40,7 +46,12 @@ class MigrationError(ErrorBase):
 
 
 class MigrationInProgressError(ErrorBase):
-    pass
+    def __init__(self, target):
+        super().__init__(target)
+        self.target = target
+
+    def __str__(self):
+        return f'there is a migration in progress for version {self.target}'
 
 
 class NoGuardrailsError(ErrorBase):
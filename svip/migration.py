@@ -15,14 +15,18 @@ This module provides classes related to the migration process.
 """
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 import abc
 import collections.abc
+import contextlib
 import enum
+import fnmatch
 import importlib
 import inspect
+import os
 import pathlib
 import traceback
+import types
 import typing as T
 
 import semantic_version as semver
@@ -114,12 +118,34 @@ class MigrationManager:
         self.__path = path
 
         # Data that is filled with ``__read_migrations_dir()``. Any method that
-        # needs to access this must call ``__read_migrations_dir()``.
+        # needs to access this must call ``__read_migrations_dir()``. Versions
+        # and paths are kept as tuples, since they only change when a new step
+        # script is created.
         self.__version_indices = None
         self.__versions = None
         self.__steps_paths = None
         self.__ctx = ctx
 
+        # Cache of loaded step modules, keyed by version.
+        self.__step_modules = {}
+
+        # Cache of results of ``get_latest_match()``, keyed by spec.
+        self.__latest_matches = {}
+
+    def reload(self):
+        """
+        Discard the cached information about migration steps.
+
+        The directory of migration steps is read again and step scripts are
+        loaded again the next time they are needed. This is only necessary if
+        the directory is changed by other means than this object.
+        """
+        self.__version_indices = None
+        self.__versions = None
+        self.__steps_paths = None
+        self.__step_modules = {}
+        self.__latest_matches = {}
+
     def new_step_script(self,
             name: str,
             bump_type: BumpType,
@@ -178,8 +204,9 @@ class MigrationManager:
         script_path.write_text(script_content)
 
         self.__version_indices[next_version] = len(self.__versions)
-        self.__versions.append(next_version)
-        self.__steps_paths.append(script_path)
+        self.__versions += (next_version,)
+        self.__steps_paths += (script_path,)
+        self.__latest_matches.clear()
 
         return script_path, next_version
 
@@ -196,8 +223,12 @@ class MigrationManager:
         :returns: the matched version object.
         """
         self.__read_migrations_dir()
+        if spec in self.__latest_matches:
+            return self.__latest_matches[spec]
+
         for v in reversed(self.__versions):
             if spec.match(v):
+                self.__latest_matches[spec] = v
                 return v
         else:
             msg = f'no migration step found for spec {spec}'
@@ -206,7 +237,7 @@ class MigrationManager:
     def get_versions(self,
             current: semver.Version,
             target: semver.Version,
-        ) -> Iterable[semver.Version]:
+        ) -> Iterator[semver.Version]:
         """
         Find the sequences of versions between `current` (exclusive) and
         `target` (inclusive).
@@ -218,7 +249,9 @@ class MigrationManager:
         :raises VersionNotFoundError: if there is no migration step for either
           `current` or `target`.
 
-        :returns: an iterable of the sequence of version objects
+        :returns: an iterator over the sequence of version objects. The
+          iterator can be consumed only once; wrap it with ``list()`` if the
+          sequence needs to be traversed more than once.
 
         This method is useful for knowing the sequence of versions for which
         there must be migration steps in order to migration the schema version
@@ -230,40 +263,52 @@ class MigrationManager:
         """
         self.__read_migrations_dir()
 
-        if current != V0 and current not in self.__version_indices:
+        # Look up each index only once and reuse it for the slice bounds below.
+        # The index -1 represents V0, which has no migration step.
+        vi = self.__version_indices
+
+        i_current = -1 if current == V0 else vi.get(current)
+        if i_current is None:
             msg = f'no migration step found for {current}'
             raise errors.VersionNotFoundError(msg)
 
-        if target != V0 and target not in self.__version_indices:
+        i_target = -1 if target == V0 else vi.get(target)
+        if i_target is None:
             msg = f'no migration step found for {target}'
             raise errors.VersionNotFoundError(msg)
 
-        if current == target:
-            return []
+        if i_current == i_target:
+            return iter(())
 
-        if current < target:
-            a = current
-            b = target
+        if i_current < i_target:
+            i_a = i_current
+            i_b = i_target
             is_upgrade = True
         else:
-            a = target
-            b = current
+            i_a = i_target
+            i_b = i_current
             is_upgrade = False
 
-        slice_start = 0 if a == V0 else (self.__version_indices[a] + 1)
-        slice_end = self.__version_indices[b] + 1
-        sliced_versions = self.__versions[slice_start:slice_end]
-        r = sliced_versions if is_upgrade else reversed(sliced_versions)
-        return list(r)
+        sliced_versions = self.__versions[i_a + 1:i_b + 1]
+        if is_upgrade:
+            return iter(sliced_versions)
+        else:
+            return reversed(sliced_versions)
 
-    def __create_step_object(self,
+    def __load_step_module(self,
         version: semver.Version,
-        is_upgrade: bool,
-    ) -> MigrationStep:
-        i = self.__version_indices[version]
+        step_path: pathlib.Path,
+    ) -> types.ModuleType:
+        """
+        Load and return the module of the script for `version`.
+
+        Successfully loaded modules are cached, so that each script is executed
+        only once until `reload()` is called.
+        """
+        module = self.__step_modules.get(version)
+        if module is not None:
+            return module
 
-        # Load the module
-        step_path = self.__steps_paths[i]
         spec = importlib.util.spec_from_file_location(
             f'step_for_v_{version.major}_{version.minor}_{version.patch}',
             step_path,
@@ -275,6 +320,17 @@ class MigrationManager:
             formatted_error = traceback.format_exc(limit=-1)
             raise errors.InvalidStepSource(f'bad Python code for {step_path}: {formatted_error}')
 
+        self.__step_modules[version] = module
+        return module
+
+    def __create_step_object(self,
+        version: semver.Version,
+        is_upgrade: bool,
+    ) -> MigrationStep:
+        i = self.__version_indices[version]
+        step_path = self.__steps_paths[i]
+        module = self.__load_step_module(version, step_path)
+
         # Create the subclass of MigrationStep
         class_name = step_path.stem
         class_bases = (MigrationStep,)
@@ -365,12 +421,11 @@ class MigrationManager:
         :returns: an iterable containing the sequence of migration steps
           necessary for the migration.
         """
-        versions = self.get_versions(current=current, target=target)
         is_upgrade = target > current
 
         # For each version, load the python code, create a subclass of
         # MigrationStep and instantiate it
-        for version in versions:
+        for version in self.get_versions(current=current, target=target):
             yield self.__create_step_object(version, is_upgrade)
 
     def __read_migrations_dir(self):
@@ -384,15 +439,32 @@ class MigrationManager:
         if self.__version_indices is not None:
             return
 
-        paths = list(self.__path.glob('v*__*.py'))
-
-        # Let's check if there are other scripts in there. A migration step not
-        # being recognized because typo is dangerous for data integrity.
+        # Classify all scripts in a single pass over the directory. Besides
+        # migration steps, let's check if there are other scripts in there. A
+        # migration step not being recognized because typo is dangerous for
+        # data integrity.
         # TODO: document the possibility of having helper modules prefixed with
         # 'mod_'.
-        all_paths = set(self.__path.glob('*.py'))
-        mod_paths = set(self.__path.glob('mod_*.py'))
-        unrecognized_paths = all_paths - mod_paths - set(paths)
+        #
+        # Use os.scandir() so that checking for regular files uses the
+        # information already returned when listing the directory. A missing
+        # directory is treated as one without migration steps.
+        paths = []
+        unrecognized_paths = set()
+        try:
+            entries = os.scandir(self.__path)
+        except FileNotFoundError:
+            entries = contextlib.nullcontext(())
+        with entries as it:
+            for entry in it:
+                name = entry.name
+                if not name.endswith('.py') or not entry.is_file():
+                    continue
+                if fnmatch.fnmatchcase(name, 'v*__*.py'):
+                    paths.append(self.__path / name)
+                elif not name.startswith('mod_'):
+                    unrecognized_paths.add(self.__path / name)
+
         if unrecognized_paths:
             msg = f'found the following unrecognized scripts in {self.__path}: {unrecognized_paths}'
             raise errors.UnrecognizedScriptFound(msg)
@@ -414,7 +486,8 @@ class MigrationManager:
 
         if paths:
             versions, paths = zip(*sorted(zip(versions, paths)))
-            versions, paths = list(versions), list(paths)
+        else:
+            versions, paths = (), ()
 
         for i in range(1, len(versions)):
             if versions[i] == versions[i - 1]:
@@ -433,6 +506,11 @@ class MigrationInfo:
     A `MigrationInfo` object stores information about a migration process.
     """
 
+    __slots__ = (
+        'current',
+        'target',
+    )
+
     def __init__(self, current: semver.Version, target: semver.Version):
         """
         Initialize the object.
@@ -6,8 +6,11 @@ used for performing common operations of SVIP.
 from __future__ import annotations
 
 import contextlib
+import functools
 import pathlib
+import re
 import sys
+import time
 import traceback
 import typing as T
 
@@ -17,9 +20,11 @@ from . import (
     appstate,
     errors,
     migration,
-    cli,
 )
 
+if T.TYPE_CHECKING:
+    from . import cli
+
 
 DEFAULT_MIGRATIONS_DIR = pathlib.Path('migrations')
 """
@@ -27,13 +32,151 @@ The default path used for `SVIPConf.migrations_dir`.
 """
 
 
+def _pr_stdout(fmt: str, *args):
+    """
+    Print a feedback message to the standard output.
+
+    If `args` is not empty, the message is built as ``fmt % args``, so that
+    callers do not pay for formatting when feedback is disabled.
+    """
+    print(fmt % args if args else fmt, file=sys.stdout)
+
+
+def _pr_noop(fmt: str, *args):
+    """
+    Discard feedback messages. Used when not in verbose mode.
+    """
+    pass
+
+
+_SIMPLE_SPEC_RE = re.compile(
+    r'^([~^]?)(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)$'
+)
+"""
+Regular expression matching the simple forms of version specifications
+handled by `_FastSpec`: ``X.Y.Z``, ``~X.Y.Z`` and ``^X.Y.Z``.
+"""
+
+
+class _FastSpec:
+    """
+    Lightweight replacement for `semantic_version.NpmSpec` for the simple
+    specifications matched by `_SIMPLE_SPEC_RE`.
+
+    Such specifications are equivalent to a range ``>=low <high`` that does
+    not include prereleases, which can be checked with plain tuple comparisons.
+
+    This class only provides what SVIP needs for matching versions. Objects of
+    this class must not reach users: use `npm_spec()` to get the equivalent
+    `semantic_version.NpmSpec` when a specification must be exposed (e.g. in
+    errors).
+    """
+
+    __slots__ = (
+        '__expression',
+        '__low',
+        '__high',
+        '__npm_spec',
+    )
+
+    def __init__(self, expression: str, op: str, major: int, minor: int, patch: int):
+        self.__expression = expression
+        self.__low = (major, minor, patch)
+        if op == '~':
+            self.__high = (major, minor + 1, 0)
+        elif op == '^':
+            if major:
+                self.__high = (major + 1, 0, 0)
+            elif minor:
+                self.__high = (0, minor + 1, 0)
+            else:
+                self.__high = (0, 0, patch + 1)
+        else:
+            self.__high = (major, minor, patch + 1)
+        self.__npm_spec = None
+
+    def match(self, version: semver.Version) -> bool:
+        if version.prerelease:
+            return False
+        return self.__low <= (version.major, version.minor, version.patch) < self.__high
+
+    def __contains__(self, version: semver.Version) -> bool:
+        return self.match(version)
+
+    def npm_spec(self) -> semver.NpmSpec:
+        """
+        Return the `semantic_version.NpmSpec` equivalent to this object, which
+        is only parsed on the first call.
+        """
+        if self.__npm_spec is None:
+            self.__npm_spec = semver.NpmSpec(self.__expression)
+        return self.__npm_spec
+
+    def __str__(self):
+        return self.__expression
+
+    def __repr__(self):
+        return f'<_FastSpec: {self.__expression!r}>'
+
+    def __eq__(self, other):
+        if not isinstance(other, _FastSpec):
+            return NotImplemented
+        return self.__expression == other.__expression
+
+    def __hash__(self):
+        return hash(self.__expression)
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_spec(s: str) -> T.Union[semver.NpmSpec, _FastSpec]:
+    """
+    Parse an NPM-style version specification, caching the result for repeated
+    calls with the same string.
+
+    Simple specifications (see `_SIMPLE_SPEC_RE`) are handled by `_FastSpec`
+    instead of going through the full NPM grammar.
+    """
+    m = _SIMPLE_SPEC_RE.match(s)
+    if m:
+        op, major, minor, patch = m.groups()
+        return _FastSpec(s, op, int(major), int(minor), int(patch))
+    return semver.NpmSpec(s)
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_version(s: str) -> semver.Version:
+    """
+    Parse a version string, caching the result for repeated calls with the
+    same string.
+    """
+    return semver.Version(s)
+
+
+@functools.lru_cache(maxsize=1024)
+def _spec_match(
+        spec: T.Union[semver.NpmSpec, _FastSpec],
+        version: semver.Version,
+    ) -> bool:
+    """
+    Return whether `version` satisfies `spec`, caching the result for repeated
+    calls with the same pair.
+    """
+    return spec.match(version)
+
+
 class SVIPConf:
     """
     Configuration object for instances of `SVIP`.
     """
 
+    __slots__ = (
+        'migrations_dir',
+        'check_cache_ttl',
+    )
+
     def __init__(self,
             migrations_dir: pathlib.Path = DEFAULT_MIGRATIONS_DIR,
+            check_cache_ttl: float = 0,
         ):
         """
         Initialize the configuration object.
@@ -42,8 +185,23 @@ class SVIPConf:
 
         :param migrations_dir: path to the directory where migration scripts
           are located.
+
+        :param check_cache_ttl: number of seconds during which a successful
+          call to `SVIP.check()` is remembered. Within that time, subsequent
+          calls with the same version specification return immediately,
+          without querying the application state back end. The default value
+          of 0 disables this behavior.
         """
-        self.migrations_dir = pathlib.Path(migrations_dir)
+        if not isinstance(migrations_dir, pathlib.Path):
+            migrations_dir = pathlib.Path(migrations_dir)
+        self.migrations_dir = migrations_dir
+        self.check_cache_ttl = check_cache_ttl
+
+
+_DEFAULT_CONF = SVIPConf()
+"""
+Configuration object used by `SVIP` when none is passed to its constructor.
+"""
 
 
 class SVIP:
@@ -51,10 +209,21 @@ class SVIP:
     The class ``SVIP`` provides the main funcionalities of this library.
     """
 
+    __slots__ = (
+        '__asb',
+        '__supports_backup',
+        '__supports_transaction',
+        '__backup_supports_restore',
+        '__req',
+        '__conf',
+        '__last_ok_check',
+        '__manager',
+    )
+
     def __init__(self,
             asb: appstate.AppStateBackend,
             req: T.Union[str, semver.NpmSpec] = None,
-            conf: SVIPConf = SVIPConf(),
+            conf: SVIPConf = None,
             ctx: T.Any = None,
         ):
         """
@@ -63,14 +232,17 @@ class SVIP:
         :param asb: the back end to be used for performing operations on the
           application's state during a migration. Those include getting and
           updating version information; generating and restoring backup; and
-          encapsulating the migration process in a transaction.
+          encapsulating the migration process in a transaction. The
+          capabilities of the back end (support for backups, restoration of
+          backups and transactions) are probed only once, by this constructor.
 
         :param req: if not none, an NPM-style version specification that
           indicates the required version range the current application code
           requires the state schema to be in. If a non-empty `str` is provided
-          for this parameter, it is converted to a `semantic_version.NpmSpec`.
+          for this parameter, it is parsed as an NPM-style specification.
 
-        :param conf: the configuration object.
+        :param conf: the configuration object. If omitted, a configuration
+          object with default values is used.
 
         :param ctx: value that will be passed down to the migration manager.
           This can be used to share data or resources that will be used by the
@@ -78,11 +250,20 @@ class SVIP:
         """
         self.__asb = asb
 
+        # Capabilities of a back end do not change during its lifetime, so
+        # let's probe them only once.
+        self.__supports_backup = asb.supports_backup()
+        self.__supports_transaction = asb.supports_transaction()
+        self.__backup_supports_restore = asb.backup_supports_restore()
+
         if req and isinstance(req, str):
-            req = semver.NpmSpec(req)
+            req = _parse_spec(req)
         self.__req = req or None
 
-        self.__conf = conf
+        self.__conf = conf or _DEFAULT_CONF
+
+        # Specification and expiration time of the last successful check().
+        self.__last_ok_check = None
 
         self.__manager = migration.MigrationManager(
             path=self.__conf.migrations_dir,
@@ -104,8 +285,8 @@ class SVIP:
           indicates the version range the current application code requires the
           state schema to be in. If omitted, the argument passed to the ``req``
           parameter of the constructor is used. If a non-empty `str` is
-          provided for this parameter, it is converted to a
-          `semantic_version.NpmSpec`.
+          provided for this parameter, it is parsed as an NPM-style
+          specification.
 
         This method does the following checks:
 
@@ -118,6 +299,11 @@ class SVIP:
 
         If any check fails, an exception is raised.
 
+        If ``check_cache_ttl`` is set in the configuration object, a successful
+        result is remembered for that many seconds and the checks above are
+        skipped for calls with the same `spec` within that time window. See
+        also `invalidate_check_cache()`.
+
         :raises InconsistentStateError: if the application state is marked as
           inconsistent.
 
@@ -126,18 +312,24 @@ class SVIP:
         :raises IncompatibleVersionError: if the current version of the schema
           is incompatible with `spec`.
         """
-        inconsistency = self.__asb.get_inconsistency()
+        # The cache is keyed on the argument as passed, so that a cached result
+        # can be used without parsing it.
+        spec_arg = spec
+        if self.__last_ok_check is not None:
+            last_ok_spec_arg, expires_at = self.__last_ok_check
+            if last_ok_spec_arg == spec_arg and time.monotonic() < expires_at:
+                return
+
+        inconsistency, current, target = self.__asb.get_state()
         if inconsistency:
             msg = 'application state is marked as inconsistent'
             raise errors.InconsistentStateError()
 
-        current, target = self.__asb.get_version()
         if target is not None:
-            msg = f'there is a migration in progress for version {target}'
-            raise errors.MigrationInProgressError(msg)
+            raise errors.MigrationInProgressError(target)
 
         if spec and isinstance(spec, str):
-            spec = semver.NpmSpec(spec)
+            spec = _parse_spec(spec)
 
         if not spec:
             spec = self.__req
@@ -146,14 +338,33 @@ class SVIP:
             msg = 'a version specification is required for check(): either is as argument for either this method or the constructor'
             raise ValueError(msg)
 
-        if not spec.match(current):
-            msg = f'version spec {spec} is incompatible with current schema version {current}'
-            raise errors.IncompatibleVersionError(msg)
+        if not _spec_match(spec, current):
+            if isinstance(spec, _FastSpec):
+                spec = spec.npm_spec()
+            raise errors.IncompatibleVersionError(spec, current)
+
+        if self.__conf.check_cache_ttl:
+            expires_at = time.monotonic() + self.__conf.check_cache_ttl
+            self.__last_ok_check = spec_arg, expires_at
+
+    def invalidate_check_cache(self):
+        """
+        Forget the last successful call to `check()`, so that the next call
+        queries the application state back end again.
+
+        This is only relevant if ``check_cache_ttl`` is set in the
+        configuration object. A migration performed with `migrate()`
+        invalidates it automatically.
+        """
+        self.__last_ok_check = None
 
     def cli(self) -> cli.CLI:
         """
         Provide an object for command line interface.
         """
+        # The CLI module is imported here so that library users that never
+        # use the command line interface do not pay for importing it.
+        from . import cli
         return cli.CLI(self)
 
     def get_migrations_manager(self) -> migration.MigrationManager:
@@ -242,18 +453,14 @@ class SVIP:
         :raises TransactionFailedError: if an error occurred when creating the
           transaction.
         """
-        if verbose:
-            def pr(*k, **kw):
-                kw['file'] = sys.stdout
-                print(*k, **kw)
-        else:
-            def pr(*k, **kw):
-                pass
+        pr = _pr_stdout if verbose else _pr_noop
+
+        self.invalidate_check_cache()
 
         pr('Performing pre-flight checks...')
 
         if target and isinstance(target, str):
-            target = semver.Version(target)
+            target = _parse_version(target)
 
         if not target:
             if not self.__req:
@@ -262,34 +469,32 @@ class SVIP:
             target = self.__manager.get_latest_match(self.__req)
 
         # Some preflight checks
-        if save_backup and not self.__asb.supports_backup():
+        if save_backup and not self.__supports_backup:
             msg = 'the application state back end does not support backup operations'
             raise errors.BackupNotImplementedError(msg)
 
         if (
-            not save_backup and not self.__asb.supports_transaction() and
+            not save_backup and not self.__supports_transaction and
             not allow_no_guardrails
         ):
             msg = 'refusing to continue: migration would run with no backup and no transaction'
             raise errors.NoGuardrailsError(msg)
 
         if restore_backup is None:
-            restore_backup = not self.__asb.supports_transaction()
+            restore_backup = not self.__supports_transaction
 
-        if restore_backup and not self.__asb.backup_supports_restore():
+        if restore_backup and not self.__backup_supports_restore:
             msg = 'the application state back end does not support restoring backups'
             raise errors.RestoreNotImplementedError(msg)
 
-        inconsistency = self.__asb.get_inconsistency()
+        inconsistency, current, _ = self.__asb.get_state()
         if inconsistency:
             msg = 'refusing to continue: application state is marked as inconsistent'
             raise errors.InconsistentStateError(msg)
 
         pr('Pre-flight checks passed.')
 
-        current, _ = self.__asb.get_version()
-
-        pr(f'Current schema version: {current}')
+        pr('Current schema version: %s', current)
 
         if current == target:
             pr('Current schema version matches target version. Nothing to do.')
@@ -299,8 +504,10 @@ class SVIP:
         steps = self.__manager.get_steps(current=current, target=target)
 
         pr(
-            f'We will {"upgrade" if is_upgrade else "downgrade"} the schema '
-            f'version from {current} to {target}'
+            'We will %s the schema version from %s to %s',
+            'upgrade' if is_upgrade else 'downgrade',
+            current,
+            target,
         )
 
         # Mark the start of a migration process.
@@ -315,8 +522,7 @@ class SVIP:
         else:
             if not updated:
                 if target_before is not None:
-                    msg = f'there is a migration in progress for version {target_before}'
-                    raise errors.MigrationInProgressError(msg)
+                    raise errors.MigrationInProgressError(target_before)
                 else:
                     msg = 'failed to update version state before migration: unknown reason'
                     raise RuntimeError(msg)
@@ -327,40 +533,19 @@ class SVIP:
             target=target,
         )
 
-        def restore_version(original_error):
-            pr(f'Restoring version value to {current}')
-            try:
-                restored, _, _ = self.__asb.set_version(
-                    current=current,
-                    target=None,
-                )
-                if not restored:
-                    raise Exception('unknown reason')
-            except Exception as e:
-                msg = f'failed to restore version after migration error: {e}'
-                msg += f'\nmigration error: {original_error}'
-                raise errors.RestoreFailedError(msg, original_error) from e
-
         # Save a backup if applicable.
         backup = None
+        backup_info = None
         if save_backup:
             try:
-                backup = self.__backup(migration_info, verbose=verbose)
+                backup, backup_info = self.__backup(migration_info, verbose=verbose)
             except Exception as error:
-                backup = None
-                try:
-                    restore_version(error)
-                except Exception as restore_version_error:
-                    self.__asb.register_inconsistency(
-                        str(restore_version_error),
-                        None,
-                    )
-                    raise
-                raise error
+                self.__restore_version_or_mark_inconsistent(current, error, None, None, pr)
+                raise
 
         # Create the transaction if applicable.
         try:
-            if self.__asb.supports_transaction():
+            if self.__supports_transaction:
                 pr('Migration will be ensapsulated in a transaction.')
                 transaction = self.__asb.transaction()
             else:
@@ -369,28 +554,23 @@ class SVIP:
         except Exception as e:
             msg = f'failed to start transaction: {e}'
             error = errors.TransactionFailedError(msg)
-            try:
-                restore_version(error)
-            except Exception as restore_version_error:
-                self.__asb.register_inconsistency(
-                    str(restore_version_error),
-                    backup.info() if backup else None,
-                )
-                raise
+            self.__restore_version_or_mark_inconsistent(current, error, backup, backup_info, pr)
             raise error
 
         # Run the migration!
+        method_name = 'up' if is_upgrade else 'down'
+
         try:
             with transaction:
                 for step in steps:
-                    pr(f'Running {"up" if is_upgrade else "down"}() of {step.path.name}')
+                    pr('Running %s() of %s', method_name, step.path.name)
                     try:
                         if is_upgrade:
                             step.up()
                         else:
                             step.down()
                     except Exception as e:
-                        pr(f'Step {step.path.name} FAILED!')
+                        pr('Step %s FAILED!', step.path.name)
                         formatted_error = traceback.format_exc(limit=-1)
                         if is_upgrade:
                             msg = f'error running upgrade step to {step.version}: {formatted_error}'
@@ -417,8 +597,8 @@ class SVIP:
             # Try to somehow restore application state, if not possible
             # mark state as inconsistent
             try:
-                if self.__asb.supports_transaction() and transaction.rollback_successful():
-                    restore_version(migration_error)
+                if self.__supports_transaction and transaction.rollback_successful():
+                    self.__restore_version(current, migration_error, pr)
                 elif save_backup and restore_backup and backup:
                     pr('Restoring backup...')
                     try:
@@ -428,7 +608,7 @@ class SVIP:
                         msg += f'\nmigration error: {migration_error}'
                         raise errors.RestoreFailedError(msg, migration_error) from e
                     else:
-                        restore_version(migration_error)
+                        self.__restore_version(current, migration_error, pr)
                         pr('Backup restored.')
                 else:
                     # Well, if we have no means of restoring application state,
@@ -439,10 +619,7 @@ class SVIP:
             except Exception as e:
                 # We were not able to restore application state. Let's mark it
                 # as inconsistent and re-raise the error.
-                self.__asb.register_inconsistency(
-                    str(e),
-                    backup.info() if backup else None,
-                )
+                self.__mark_inconsistent(e, backup, backup_info)
                 raise
             else:
                 # If we got here, at least we were able to restore the
@@ -463,25 +640,24 @@ class SVIP:
           as backup information is printed to the standard output. The default
           is false.
         """
-        if not self.__asb.supports_backup():
+        if not self.__supports_backup:
             msg = 'the application state back end does not support backup operations'
             raise errors.BackupNotImplementedError(msg)
-        return self.__backup(migration_info=None, verbose=verbose)
+        backup, _ = self.__backup(migration_info=None, verbose=verbose)
+        return backup
 
     def __backup(self,
         migration_info: T.Union[None, migration.MigrationInfo],
         verbose: bool,
-    ) -> appstate.AppStateBackup:
+    ) -> T.Tuple[appstate.AppStateBackup, T.Union[None, str]]:
         """
         Use the ASB to perform a backup.
+
+        Return a 2-element tuple containing the backup object and the result
+        of its ``info()`` method. The latter is only computed (and printed)
+        when in verbose mode, otherwise it is ``None``.
         """
-        if verbose:
-            def pr(*k, **kw):
-                kw['file'] = sys.stdout
-                print(*k, **kw)
-        else:
-            def pr(*k, **kw):
-                pass
+        pr = _pr_stdout if verbose else _pr_noop
 
         pr('Saving backup...')
         try:
@@ -489,9 +665,69 @@ class SVIP:
         except Exception as e:
             msg = f'failed to perform backup: {e}'
             raise errors.BackupFailedError(msg)
-            raise error
         else:
-            pr('Backup information:')
-            for line in backup.info().splitlines():
-                pr(f'    {line}')
-            return backup
+            info = None
+            if verbose:
+                info = backup.info()
+                pr('Backup information:')
+                for line in info.splitlines():
+                    pr('    %s', line)
+            return backup, info
+
+    def __restore_version(self,
+        current: semver.Version,
+        original_error: Exception,
+        pr: T.Callable,
+    ):
+        """
+        Restore the version information to `current` after the migration
+        process was interrupted by `original_error`.
+
+        :raises RestoreFailedError: if the version could not be restored.
+        """
+        pr('Restoring version value to %s', current)
+        try:
+            restored, _, _ = self.__asb.set_version(
+                current=current,
+                target=None,
+            )
+            if not restored:
+                raise Exception('unknown reason')
+        except Exception as e:
+            msg = f'failed to restore version after migration error: {e}'
+            msg += f'\nmigration error: {original_error}'
+            raise errors.RestoreFailedError(msg, original_error) from e
+
+    def __mark_inconsistent(self,
+        error: Exception,
+        backup: T.Union[None, appstate.AppStateBackup],
+        backup_info: T.Union[None, str],
+    ):
+        """
+        Register the application state as inconsistent because of `error`.
+
+        The backup information is included if a backup was saved. In that case,
+        `backup_info` is used if already known, otherwise it is obtained from
+        `backup`.
+        """
+        if backup and backup_info is None:
+            backup_info = backup.info()
+        self.__asb.register_inconsistency(str(error), backup_info)
+
+    def __restore_version_or_mark_inconsistent(self,
+        current: semver.Version,
+        original_error: Exception,
+        backup: T.Union[None, appstate.AppStateBackup],
+        backup_info: T.Union[None, str],
+        pr: T.Callable,
+    ):
+        """
+        Restore the version information with `__restore_version()`. If that
+        fails, mark the application state as inconsistent and re-raise the
+        error.
+        """
+        try:
+            self.__restore_version(current, original_error, pr)
+        except Exception as e:
+            self.__mark_inconsistent(e, backup, backup_info)
+            raise
@@ -9,12 +9,27 @@ import semantic_version as semver
 
 import copy
 import datetime
+import functools
 import itertools
 import typing as T
 
 import svip
 
 
+_STATE_FIELDS = (
+    'current_version',
+    'target_version',
+    'version_history',
+    'inconsistency',
+    'data',
+    'set_string_data',
+)
+"""
+Names of the parts of the state of an `AppStateMock`, in the order used by
+tuples returned by `AppStateMock._save_state()`.
+"""
+
+
 class AppStateMock:
     """
     An `AppStateMock` object provides the attribute `asb` as an application
@@ -24,6 +39,12 @@ class AppStateMock:
     functionality by keeping an state object and providing the functionality
     required for subclasses of `svip.AppStateBackend`.
 
+    The state is kept in the attributes listed in ``__slots__`` whose names
+    start with an underscore. Their values are never mutated in place: updates
+    always assign new values to the attributes. That allows backups and
+    transactions to save the state with a simple tuple of those values (see
+    `_save_state()`).
+
     Along with the `asb` property, an instance of this class also provides:
 
     - ways to control the behavior of the back end via constructor parameters;
@@ -32,6 +53,16 @@ class AppStateMock:
       `get_snapshot()`.
     """
 
+    __slots__ = (
+        'asb',
+        '_current_version',
+        '_target_version',
+        '_version_history',
+        '_inconsistency',
+        '_data',
+        '_set_string_data',
+    )
+
     mock_class_counter = itertools.count()
     """
     Counter to ensure unique class names are generated when creating subclasses
@@ -54,7 +85,8 @@ class AppStateMock:
         """
         Initializes the mock object.
 
-        A subclass of `AppStateBackend` is created and used to instantiate an
+        A subclass of `AppStateBackend` is created (or reused, if one was
+        already created for the same arguments) and used to instantiate an
         object that is assigned to the ``asb`` property. The behavior of the
         provided ASB can be controlled with the parameters passed to the
         contructor:
@@ -90,193 +122,303 @@ class AppStateMock:
           subclass is also subclassed using `asb_overrides` as its dict. In
           that case, this new class is used for instantiating the ASB object.
         """
-        self.__state = {
-            'current_version': current_version,
-            'target_version': target_version,
-            'version_history': list(version_history) if version_history else [],
-            'inconsistency': inconsistency,
-            'data': None,
-            'set_string_data': '',
-        }
-        self.__create_asb(
+        self._current_version = current_version
+        self._target_version = target_version
+        self._version_history = list(version_history) if version_history else []
+        self._inconsistency = inconsistency
+        self._data = None
+        self._set_string_data = ''
+
+        cls = self.__get_asb_class(
             with_backup=with_backup,
             fail_restore_backup=fail_restore_backup,
             with_transaction=with_transaction,
             with_backup_restore=with_backup_restore,
             fail_rollback=fail_rollback,
             with_version_history=with_version_history,
-            overrides=asb_overrides,
         )
 
-    def __create_asb(self,
-        with_backup: bool = True,
-        with_backup_restore: T.Union[None, bool] = True,
-        fail_restore_backup: bool = True,
-        with_transaction: bool = True,
-        fail_rollback: bool = False,
-        with_version_history: bool = True,
-        overrides: dict = True,
-    ):
+        if asb_overrides:
+            cls = type(f'{cls.__name__}_Overriden', (cls,), asb_overrides)
+
+        self.asb = cls(self)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def __get_asb_class(
+        with_backup: bool,
+        with_backup_restore: T.Union[None, bool],
+        fail_restore_backup: bool,
+        with_transaction: bool,
+        fail_rollback: bool,
+        with_version_history: bool,
+    ) -> T.Type[svip.AppStateBackend]:
         """
-        Dynamically create a subclass of ``AppStateBackend``, instantiate
-        the object and assign it to ``self.asb``.
+        Dynamically create a subclass of ``AppStateBackend`` with the behavior
+        defined by the arguments.
+
+        The class only depends on its arguments, so it is cached and shared by
+        all mock objects created with the same ones. Its constructor receives
+        the `AppStateMock` object whose state is to be used.
         """
-        cls_name = f'AppStateMock{next(self.mock_class_counter)}'
+        cls_name = f'AppStateMock{next(AppStateMock.mock_class_counter)}'
         cls_bases = (svip.AppStateBackend,)
-        cls_dict = {}
-
-        # A decorator to make things simpler
-        def method(fn=None, cond=True):
-            def decorator(f):
-                if cond:
-                    cls_dict[f.__name__] = f
-                return f
-            if fn:
-                return decorator(fn)
-            else:
-                return decorator
-
-        # Create methods!
-        @method
-        def set_version(asb, current, target):
-            current_before, target_before = asb.get_version()
-
-            is_update_valid = (
-                (
-                    # First condition documented in AppStateBackup.set_version
-                    (target_before is None and target is not None) or
-                    (target_before is not None and target is None)
-                ) and (
-                    # Second condition documented in AppStateBackup.set_version
-                    (current_before != current) ==
-                    (current == target_before and target is None)
-                )
+        cls_dict = {
+            '__init__': _asb_init,
+            'set_version': _asb_set_version,
+            'register_inconsistency': _asb_register_inconsistency,
+            'get_inconsistency': _asb_get_inconsistency,
+            'clear_inconsistency': _asb_clear_inconsistency,
+            'get_version': _asb_get_version,
+            'get_test_interface': _asb_get_test_interface,
+        }
+
+        # Behavior switches are resolved here, by choosing specialized
+        # implementations, instead of being checked when methods are called.
+        if with_version_history:
+            cls_dict['get_version_history'] = _asb_get_version_history
+
+        if with_backup:
+            backup_dict = {}
+            if with_backup_restore:
+                if fail_restore_backup:
+                    backup_dict['restore'] = _backup_fail_restore
+                else:
+                    backup_dict['restore'] = Backup._restore_saved_state
+            cls_dict['backup'] = _asb_backup
+            cls_dict['_backup_class'] = type('Backup', (Backup,), backup_dict)
+
+            if with_backup_restore is not None:
+                if with_backup_restore:
+                    cls_dict['backup_supports_restore'] = _return_true
+                else:
+                    cls_dict['backup_supports_restore'] = _return_false
+
+        if with_transaction:
+            transaction_dict = {}
+            if fail_rollback:
+                transaction_dict['_rollback'] = _transaction_fail_rollback
+            cls_dict['transaction'] = _asb_transaction
+            cls_dict['_transaction_class'] = type(
+                'PseudoTransaction',
+                (PseudoTransaction,),
+                transaction_dict,
             )
-            if is_update_valid:
-                if self.__state['target_version'] == current:
-                    history_entry = (current, datetime.datetime.utcnow())
-                    self.__state['version_history'].append(history_entry)
-                self.__state['current_version'] = current
-                self.__state['target_version'] = target
-            return is_update_valid, current_before, target_before
 
-        @method
-        def register_inconsistency(asb, info, backup_info):
-            self.__state['inconsistency'] = info, backup_info
+        return type(cls_name, cls_bases, cls_dict)
 
-        @method
-        def get_inconsistency(asb):
-            return self.__state['inconsistency']
+    def _save_state(self) -> tuple:
+        """
+        Return the current state as a tuple that can later be passed to
+        `_restore_state()`.
 
-        @method
-        def clear_inconsistency(asb):
-            self.__state['inconsistency'] = None
+        Since values of the state are never mutated in place (see the class
+        docstring), no copy of them is necessary.
+        """
+        return (
+            self._current_version,
+            self._target_version,
+            self._version_history,
+            self._inconsistency,
+            self._data,
+            self._set_string_data,
+        )
 
-        @method
-        def get_version(asb):
-            return self.__state['current_version'], self.__state['target_version']
+    def _restore_state(self, saved_state: tuple):
+        """
+        Restore the state saved with `_save_state()`.
+        """
+        (
+            self._current_version,
+            self._target_version,
+            self._version_history,
+            self._inconsistency,
+            self._data,
+            self._set_string_data,
+        ) = saved_state
 
-        @method(cond=with_version_history)
-        def get_version_history(asb):
-            return copy.deepcopy(self.__state['version_history'])
+    def get_data(self) -> T.Any:
+        """
+        Return a deep copy of the internal data (excluding state related to
+        versioning).
 
-        def restore_state(saved_state):
-            self.__state = saved_state
+        This method can be used by migration steps as well as test code.
+        """
+        data = self._data
+        return copy.deepcopy(data) if data is not None else None
 
-        def copy_state():
-            return copy.deepcopy(self.__state)
+    def set_data(self, data: T.Any):
+        """
+        Make a deep copy of `data` and replace the internal data with it.
 
-        @method(cond=with_backup)
-        def backup(asb, info):
+        This only replaces data not related to versioning. This method can be
+        used by migration steps as well as test code.
+        """
+        self._data = copy.deepcopy(data) if data is not None else None
 
-            class Backup(svip.AppStateBackup):
-                def __init__(bkp, info):
-                    bkp.__saved_state = copy_state()
+    def append_to_data(self, item: T.Any):
+        """
+        Append `item` to the internal data, which must be either None (in which
+        case it is taken as an empty list) or a list.
+
+        This is a cheaper alternative to calling `get_data()`, appending to the
+        result and calling `set_data()`, since none of the data is deep copied.
+        As with every other update of the state, a new list is assigned
+        instead of changing the current one in place. This method can be used
+        by migration steps.
+        """
+        self._data = [*(self._data or []), item]
 
-                if with_backup_restore:
-                    def restore(bkp):
-                        if fail_restore_backup:
-                            raise Exception('backup restore failed on purpose')
-                        restore_state(bkp.__saved_state)
+    def get_snapshot(self) -> T.Any:
+        """
+        Return a snapshot of the entire internal state.
 
-            return Backup(copy_state())
+        This method can be used by test code.
+        """
+        snapshot = dict(zip(_STATE_FIELDS, self._save_state()))
+        # Test code may change the returned values, so let's copy the mutable
+        # ones.
+        snapshot['version_history'] = snapshot['version_history'][:]
+        snapshot['data'] = self.get_data()
+        return snapshot
 
-        @method(cond=with_backup and with_backup_restore is not None)
-        def backup_supports_restore(asb):
-            return with_backup_restore
 
-        @method(cond=with_transaction)
-        def transaction(self):
-            class PseudoTransaction(svip.AppStateTransaction):
-                def __init__(trs):
-                    trs.__entered = False
-                    trs.__rollback_successful = False
+# The functions and classes below implement the ASB classes created by
+# `AppStateMock`. The mock object is available as the attribute ``_mock`` of
+# ASB objects.
 
-                def __enter__(trs):
-                    if trs.__entered:
-                        raise RuntimeError('cannot enter transaction more than once')
-                    trs.__entered = True
-                    trs.__saved_state = copy_state()
+def _asb_init(asb, mock):
+    asb._mock = mock
 
-                def __exit__(trs, exc_type, exc_val, exc_tb):
-                    if exc_type is None:
-                        return False
-                    if not fail_rollback:
-                        restore_state(trs.__saved_state)
-                        trs.__rollback_successful = True
-                    return False
 
-                def rollback_successful(trs):
-                    return trs.__rollback_successful
+def _asb_set_version(asb, current, target):
+    mock = asb._mock
+    current_before = mock._current_version
+    target_before = mock._target_version
+    target_is_none = target is None
 
-            return PseudoTransaction()
+    # First condition documented in AppStateBackup.set_version
+    if (target_before is None) == target_is_none:
+        return False, current_before, target_before
 
-        @method
-        def get_test_interface(asb):
-            def state_dict():
-                return self.__state
+    # Second condition documented in AppStateBackup.set_version
+    if (current_before != current) != (target_is_none and current == target_before):
+        return False, current_before, target_before
 
-            class TestInterface(svip.AppStateTestInterface):
-                def set_version_no_restrictions(ti, current, target):
-                    state_dict().update(current_version=current, target_version=target)
+    if target_before == current:
+        history_entry = (current, datetime.datetime.utcnow())
+        mock._version_history = [*mock._version_history, history_entry]
+    mock._current_version = current
+    mock._target_version = target
+    return True, current_before, target_before
 
-                def set_string(ti, s):
-                    state_dict()['set_string_data'] = s
 
-                def get_string(ti):
-                    return state_dict()['set_string_data']
+def _asb_register_inconsistency(asb, info, backup_info):
+    asb._mock._inconsistency = info, backup_info
 
-            return TestInterface()
 
-        cls = type(cls_name, cls_bases, cls_dict)
+def _asb_get_inconsistency(asb):
+    return asb._mock._inconsistency
 
-        if overrides:
-            cls = type(f'{cls_name}_Overriden', (cls,), overrides)
 
-        self.asb = cls()
+def _asb_clear_inconsistency(asb):
+    asb._mock._inconsistency = None
 
-    def get_data(self) -> T.Any:
-        """
-        Return a deep copy of the internal data (excluding state related to
-        versioning).
 
-        This method can be used by migration steps as well as test code.
-        """
-        return copy.deepcopy(self.__state['data'])
+def _asb_get_version(asb):
+    mock = asb._mock
+    return mock._current_version, mock._target_version
 
-    def set_data(self, data: T.Any):
-        """
-        Make a deep copy of `data` and replace the internal data with it.
 
-        This only replaces data not related to versioning. This method can be
-        used by migration steps as well as test code.
-        """
-        self.__state['data'] = copy.deepcopy(data)
+def _asb_get_version_history(asb):
+    # Entries are tuples of immutable objects, so a shallow copy is enough.
+    return asb._mock._version_history[:]
 
-    def get_snapshot(self) -> T.Any:
-        """
-        Return a snapshot of the entire internal state.
 
-        This method can be used by test code.
-        """
-        return copy.deepcopy(self.__state)
+def _asb_backup(asb, info):
+    return asb._backup_class(asb._mock)
+
+
+def _asb_transaction(asb):
+    return asb._transaction_class(asb._mock)
+
+
+def _return_true(obj):
+    return True
+
+
+def _return_false(obj):
+    return False
+
+
+def _backup_fail_restore(bkp):
+    raise Exception('backup restore failed on purpose')
+
+
+def _transaction_fail_rollback(trs):
+    pass
+
+
+def _asb_get_test_interface(asb):
+    return TestInterface(asb._mock)
+
+
+class Backup(svip.AppStateBackup):
+    """
+    Base class for backups of an `AppStateMock`. Whether and how the backup is
+    restored is defined by the subclasses created by `AppStateMock`.
+    """
+
+    def __init__(self, mock):
+        self.__mock = mock
+        self.__saved_state = mock._save_state()
+
+    def _restore_saved_state(self):
+        self.__mock._restore_state(self.__saved_state)
+
+
+class PseudoTransaction(svip.AppStateTransaction):
+    """
+    Base class for pseudo-transactions of an `AppStateMock`. Subclasses
+    created by `AppStateMock` may override `_rollback()` to simulate failures.
+    """
+
+    def __init__(self, mock):
+        self.__mock = mock
+        self.__entered = False
+        self.__rollback_successful = False
+
+    def __enter__(self):
+        if self.__entered:
+            raise RuntimeError('cannot enter transaction more than once')
+        self.__entered = True
+        self.__saved_state = self.__mock._save_state()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._rollback()
+        return False
+
+    def _rollback(self):
+        self.__mock._restore_state(self.__saved_state)
+        self.__rollback_successful = True
+
+    def rollback_successful(self):
+        return self.__rollback_successful
+
+
+class TestInterface(svip.AppStateTestInterface):
+    __test__ = False
+
+    def __init__(self, mock):
+        self.__mock = mock
+
+    def set_version_no_restrictions(self, current, target):
+        self.__mock._current_version = current
+        self.__mock._target_version = target
+
+    def set_string(self, s):
+        self.__mock._set_string_data = s
+
+    def get_string(self):
+        return self.__mock._set_string_data
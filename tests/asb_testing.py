@@ -8,6 +8,61 @@ import semantic_version as semver
 import svip.migration
 
 
+_V000 = semver.Version('0.0.0')
+_V001 = semver.Version('0.0.1')
+_V002 = semver.Version('0.0.2')
+_V010 = semver.Version('0.1.0')
+_V100 = semver.Version('1.0.0')
+
+
+# Cases for the generated test ``test_asb_*_set_version``, which checks if the
+# ASB behaves as expected for different calls to `set_version(current,
+# target)`. The rows below represent a table of cases. The columns are:
+#
+#   - tb_is_none (or tb=0): tells whether the value of `target_before` is
+#      None;
+#
+#   - t_is_none (or t=0): tells whether the value of `target` is None;
+#
+#   - cb_eq_c (cb=c): tells whether `current_before == current`;
+#
+#   - c_eq_tb (c=tb): tells whether `current == target_before`;
+#
+#   - cb: the value for `current_before`;
+#
+#   - tb: the value for `target_before`;
+#
+#   - c: the value for `current`;
+#
+#   - t: the value for `target`.
+_SET_VERSION_TABLE = (
+#   tb=0  t=0 cb=c c=tb     cb     tb      c      t
+    (0,   0,   0,   0, _V000, _V002, _V001, _V002),
+    (0,   0,   0,   1, _V000, _V001, _V001, _V001),
+    (0,   0,   1,   0, _V000, _V001, _V000, _V002),
+#   (0,   0,   1,   1, -> Impossible situation: (cb=tb) is always False
+    (0,   1,   0,   0, _V000, _V001, _V002,  None),
+    (0,   1,   0,   1, _V000, _V001, _V001,  None),
+    (0,   1,   1,   0, _V000, _V001, _V000,  None),
+#   (0,   1,   1,   1, -> Impossible situation: (cb=tb) is always False
+    (1,   0,   0,   0, _V000,  None, _V001, _V001),
+#   (1,   0,   0,   1, -> Impossible situation: (cb=0) is always False
+    (1,   0,   1,   0, _V000,  None, _V000, _V001),
+#   (1,   0,   1,   1, -> Impossible situation: (cb=tb) is always False
+    (1,   1,   0,   0, _V000,  None, _V001,  None),
+#   (1,   1,   0,   1, -> Impossible situation: (cb=0) is always False
+    (1,   1,   1,   0, _V001,  None, _V001,  None),
+#   (1,   1,   1,   1, -> Impossible situation: (cb=tb) is always False
+)
+
+# Parameters for pytest, built once and shared by all generated tests. The id
+# of each case is made of the four boolean columns (e.g. "0010").
+_SET_VERSION_CASES = tuple(
+    pytest.param(*row, id=''.join(str(flag) for flag in row[:4]))
+    for row in _SET_VERSION_TABLE
+)
+
+
 def generate_tests(
     name,
     asb_fixture_name='asb',
@@ -21,60 +76,17 @@ def generate_tests(
     def test_initial_version(request):
         asb = request.getfixturevalue(asb_fixture_name)
         # First current version must be 0.0.0 and target must be None
-        assert asb.get_version() == (semver.Version('0.0.0'), None)
+        assert asb.get_version() == (_V000, None)
     test_functions[f'test_asb_{name}_initial_version'] = test_initial_version
 
-
-    # The following test checks if the ASB behaves as expected for different
-    # cases of calls to `set_version(current, target)`. The parameters below
-    # represent a table of cases. The columns are:
-    #
-    #   - tb_is_none (or tb=0): tells whether the value of `target_before` is
-    #      None;
-    #
-    #   - t_is_none (or t=0): tells whether the value of `target` is None;
-    #
-    #   - cb_eq_c (cb=c): tells whether `current_before == current`;
-    #
-    #   - c_eq_tb (c=tb): tells whether `current == target_before`;
-    #
-    #   - cb: the value for `current_before`;
-    #
-    #   - tb: the value for `target_before`;
-    #
-    #   - c: the value for `current`;
-    #
-    #   - t: the value for `target`.
     @pytest.mark.parametrize(
         'tb_is_none,t_is_none,cb_eq_c,c_eq_tb,cb,tb,c,t',
-        [
-    #   tb=0  t=0 cb=c c=tb       cb       tb        c        t
-         [0,   0,   0,   0, '0.0.0', '0.0.2', '0.0.1', '0.0.2'],
-         [0,   0,   0,   1, '0.0.0', '0.0.1', '0.0.1', '0.0.1'],
-         [0,   0,   1,   0, '0.0.0', '0.0.1', '0.0.0', '0.0.2'],
-    #    [0,   0,   1,   1, -> Impossible situation: (cb=tb) is always False
-         [0,   1,   0,   0, '0.0.0', '0.0.1', '0.0.2',    None],
-         [0,   1,   0,   1, '0.0.0', '0.0.1', '0.0.1',    None],
-         [0,   1,   1,   0, '0.0.0', '0.0.1', '0.0.0',    None],
-    #    [0,   1,   1,   1, -> Impossible situation: (cb=tb) is always False
-         [1,   0,   0,   0, '0.0.0',    None, '0.0.1', '0.0.1'],
-    #    [1,   0,   0,   1, -> Impossible situation: (cb=0) is always False
-         [1,   0,   1,   0, '0.0.0',    None, '0.0.0', '0.0.1'],
-    #    [1,   0,   1,   1, -> Impossible situation: (cb=tb) is always False
-         [1,   1,   0,   0, '0.0.0',    None, '0.0.1',    None],
-    #    [1,   1,   0,   1, -> Impossible situation: (cb=0) is always False
-         [1,   1,   1,   0, '0.0.1',    None, '0.0.1',    None],
-    #    [1,   1,   1,   1, -> Impossible situation: (cb=tb) is always False
-        ],
+        _SET_VERSION_CASES,
     )
     def test_set_version(
         request, tb_is_none, t_is_none, cb_eq_c, c_eq_tb, cb, tb, c, t
     ):
         asb = request.getfixturevalue(asb_fixture_name)
-        cb = semver.Version(cb)
-        tb = semver.Version(tb) if tb else None
-        c = semver.Version(c)
-        t = semver.Version(t) if t else None
 
         # Let's first make sure that the input values are valid
         assert (tb is None) == tb_is_none
@@ -115,27 +127,47 @@ def generate_tests(
         assert asb.get_inconsistency() == None
     test_functions[f'test_asb_{name}_inconsistency'] = test_inconsistency
 
+    def test_state(request):
+        asb = request.getfixturevalue(asb_fixture_name)
+
+        assert asb.get_state() == (None, _V000, None)
+
+        asb.set_version(_V000, _V001)
+        assert asb.get_state() == (
+            None,
+            _V000,
+            _V001,
+        )
+
+        asb.register_inconsistency('foo', 'bar')
+        assert asb.get_state() == (
+            ('foo', 'bar'),
+            _V000,
+            _V001,
+        )
+    test_functions[f'test_asb_{name}_state'] = test_state
+
     def test_version_history(request):
         asb = request.getfixturevalue(asb_fixture_name)
         if not supports_version_history:
             return
 
-        asb.set_version(semver.Version('0.0.0'), semver.Version('0.0.1'))
-        asb.set_version(semver.Version('0.0.1'), None)
-        asb.set_version(semver.Version('0.0.1'), semver.Version('0.1.0'))
-        asb.set_version(semver.Version('0.1.0'), None)
-        asb.set_version(semver.Version('0.1.0'), semver.Version('1.0.0'))
-        asb.set_version(semver.Version('0.1.0'), None)
-        asb.set_version(semver.Version('0.1.0'), semver.Version('1.0.0'))
-        asb.set_version(semver.Version('1.0.0'), None)
-        asb.set_version(semver.Version('1.0.0'), semver.Version('0.1.0'))
-        asb.set_version(semver.Version('0.1.0'), None)
+        asb.set_version(_V000, _V001)
+        asb.set_version(_V001, None)
+        asb.set_version(_V001, _V010)
+        asb.set_version(_V010, None)
+        asb.set_version(_V010, _V100)
+        asb.set_version(_V010, None)
+        asb.set_version(_V010, _V100)
+        asb.set_version(_V100, None)
+        asb.set_version(_V100, _V010)
+        asb.set_version(_V010, None)
 
         expected_history_versions = (
-            semver.Version('0.0.1'),
-            semver.Version('0.1.0'),
-            semver.Version('1.0.0'),
-            semver.Version('0.1.0'),
+            _V001,
+            _V010,
+            _V100,
+            _V010,
         )
 
         history = asb.get_version_history()
@@ -161,16 +193,16 @@ def generate_tests(
         if not supports_backup:
             return
 
-        asb.set_version(semver.Version('0.0.0'), semver.Version('0.0.1'))
-        asb.set_version(semver.Version('0.0.1'), None)
-        asb.set_version(semver.Version('0.0.1'), semver.Version('0.1.0'))
-        asb.set_version(semver.Version('0.1.0'), None)
-        asb.set_version(semver.Version('0.1.0'), semver.Version('1.0.0'))
+        asb.set_version(_V000, _V001)
+        asb.set_version(_V001, None)
+        asb.set_version(_V001, _V010)
+        asb.set_version(_V010, None)
+        asb.set_version(_V010, _V100)
 
         if with_migration == 'with_migration':
             migration_info = svip.migration.MigrationInfo(
-                current=semver.Version('0.1.0'),
-                target=semver.Version('1.0.0'),
+                current=_V010,
+                target=_V100,
             )
         else:
             migration_info = None
@@ -182,14 +214,14 @@ def generate_tests(
         if not backup_supports_restore:
             return
 
-        asb.set_version(semver.Version('0.1.0'), None)
-        asb.set_version(semver.Version('0.1.0'), semver.Version('1.0.0'))
-        asb.set_version(semver.Version('1.0.0'), None)
-        asb.set_version(semver.Version('1.0.0'), semver.Version('0.1.0'))
-        asb.set_version(semver.Version('0.1.0'), None)
+        asb.set_version(_V010, None)
+        asb.set_version(_V010, _V100)
+        asb.set_version(_V100, None)
+        asb.set_version(_V100, _V010)
+        asb.set_version(_V010, None)
 
         bkp.restore()
-        expected = semver.Version('0.1.0'), semver.Version('1.0.0')
+        expected = _V010, _V100
         assert asb.get_version() == expected
     test_functions[f'test_asb_{name}_backup'] = test_backup
 
@@ -1,33 +1,102 @@
 # SPDX-License-Identifier: MPL-2.0
+import argparse
+import concurrent.futures
 import contextlib
+import functools
 import itertools
+import os
 import pathlib
 import shutil
 import threading
+import time
+import typing as T
 
 import pytest
 
 import appstatemock
 import svip
+import svip.cli
 
-pytest_plugins = []
 
-# Load pytest-mongo plugin only if pymongo is available
-try:
-    import pymongo
-except ModuleNotFoundError:
-    pass
-else:
-    pytest_plugins.append('pytest_mongo.plugin')
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'read_only_steps_dirs: the test does not change migrations directories '
+        'created by svip_factory, which can then be shared with other tests',
+    )
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def datadir():
     return pathlib.Path(__file__).parent / 'data'
 
 
+@functools.lru_cache(maxsize=None)
+def list_tree(src: pathlib.Path) -> T.Tuple[T.Tuple[str, ...], T.Tuple[str, ...]]:
+    """
+    Return a tuple ``(dirs, files)`` with the paths, relative to `src`, of
+    directories and files found recursively in the directory `src`.
+
+    The result is cached for the whole session, so this must only be used for
+    directories that are never modified, like the ones in test data
+    directories.
+    """
+    if not src.is_dir():
+        raise FileNotFoundError(f'not a directory: {src}')
+    dirs = []
+    files = []
+    for dirpath, _, filenames in os.walk(src):
+        reldir = os.path.relpath(dirpath, src)
+        dirs.append(reldir)
+        files.extend(os.path.join(reldir, name) for name in filenames)
+    return tuple(dirs), tuple(files)
+
+
+def merge_trees(srcs: T.Iterable[pathlib.Path], dst: pathlib.Path):
+    """
+    Populate `dst` with hard links to the files in the directories `srcs`,
+    recursively.
+
+    When more than one source directory contains a file with the same relative
+    path, the last one wins. The merge is resolved in memory first, so that
+    each file in `dst` is created only once. If a hard link can not be created
+    (e.g. `dst` is in a different file system), the file is copied instead.
+
+    Files in test data directories are never modified by tests, so hard links
+    are enough and avoid copying their contents. For the same reason, the
+    listing of each source directory is done only once per session (see
+    `list_tree()`).
+    """
+    dirs = set()
+    manifest = {}
+    for src in srcs:
+        src_dirs, src_files = list_tree(src)
+        dirs.update(src_dirs)
+        for relpath in src_files:
+            manifest[relpath] = os.path.join(src, relpath)
+
+    for reldir in sorted(dirs):
+        (dst / reldir).mkdir(parents=True, exist_ok=True)
+
+    for relpath, src_file in manifest.items():
+        dst_file = dst / relpath
+        try:
+            os.link(src_file, dst_file)
+        except OSError:
+            shutil.copy2(src_file, dst_file)
+
+
+@pytest.fixture(scope='session')
+def shared_steps_dirs():
+    """
+    Session-wide cache of directories created by `merge_steps_dirs` with
+    ``shared=True``, keyed by the tuple of merged paths.
+    """
+    return {}
+
+
 @pytest.fixture
-def merge_steps_dirs(tmp_path):
+def merge_steps_dirs(tmp_path, tmp_path_factory, shared_steps_dirs):
     """
     Fixture that returns a factory to merge steps from one or more directories
     into a new directory.
@@ -35,18 +104,23 @@ def merge_steps_dirs(tmp_path):
     This provides the convenience of not needing to create a lot of files for a
     test case: just create the step for the case you want to test and inherit
     step script from another directory.
+
+    If the keyword argument ``shared`` is true, the resulting directory is
+    reused by any other call with the same paths during the test session, which
+    also allows Python to reuse bytecode compiled for step scripts. Only tests
+    that do not add files to the directory must use that.
     """
     counter = itertools.count()
-    def factory(*paths):
-        dstdir = tmp_path / f'steps-{next(counter)}'
-        for p in paths:
-            if p is None:
-                continue
-            shutil.copytree(
-                p,
-                dstdir,
-                dirs_exist_ok=True,
-            )
+    def factory(*paths, shared=False):
+        if shared:
+            if paths in shared_steps_dirs:
+                return shared_steps_dirs[paths]
+            dstdir = tmp_path_factory.mktemp('shared-steps') / 'steps'
+        else:
+            dstdir = tmp_path / f'steps-{next(counter)}'
+        merge_trees((p for p in paths if p is not None), dstdir)
+        if shared:
+            shared_steps_dirs[paths] = dstdir
         return dstdir
     return factory
 
@@ -74,17 +148,20 @@ def get_steps_dir_factory(datadir, merge_steps_dirs):
 @pytest.fixture
 def migrations_with_appstatemock_dir_factory(datadir, merge_steps_dirs):
     base = datadir / 'migrations-with-appstatemock' / 'base-migrations'
-    def factory(*names, inherit_from=base):
+    def factory(*names, inherit_from=base, shared=False):
         args = [inherit_from] if inherit_from else []
         args += [datadir / 'migrations-with-appstatemock' / name for name in names]
-        return merge_steps_dirs(*args)
+        return merge_steps_dirs(*args, shared=shared)
     return factory
 
 
 @pytest.fixture
-def svip_factory(migrations_with_appstatemock_dir_factory):
-    def factory(dirs=[], ctx_extra={}, appstate=None, req='', **appstatemock_kw):
-        migrations_dir=migrations_with_appstatemock_dir_factory(*dirs)
+def svip_factory(request, migrations_with_appstatemock_dir_factory):
+    # Migrations directories are only shared with other tests if the test
+    # declares that it does not change them (see pytest_configure()).
+    shared = request.node.get_closest_marker('read_only_steps_dirs') is not None
+    def factory(dirs=[], ctx_extra={}, conf_extra={}, appstate=None, req='', **appstatemock_kw):
+        migrations_dir=migrations_with_appstatemock_dir_factory(*dirs, shared=shared)
         if not appstate:
             appstate = appstatemock.AppStateMock(**appstatemock_kw)
         ctx = {'appstate': appstate}
@@ -92,13 +169,20 @@ def svip_factory(migrations_with_appstatemock_dir_factory):
         sv = svip.SVIP(
             asb=appstate.asb,
             req=req,
-            conf=svip.SVIPConf(migrations_dir=migrations_dir),
+            conf=svip.SVIPConf(migrations_dir=migrations_dir, **conf_extra),
             ctx=ctx,
         )
         return sv, appstate
     return factory
 
 
+_BACKGROUND_TIMEOUT = 30
+"""
+Maximum time, in seconds, to wait for code running in the background during
+a test.
+"""
+
+
 @pytest.fixture
 def migration_in_progress_factory(svip_factory):
     @contextlib.contextmanager
@@ -114,17 +198,42 @@ def migration_in_progress_factory(svip_factory):
             appstate=appstate,
         )
 
-        first_migration_thread = threading.Thread(
-            target=sv1.migrate,
-            kwargs={'target': target},
-        )
-        first_migration_thread.start()
+        # Each call gets its own thread, so that nested in-progress migrations
+        # never wait for each other.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            first_migration = executor.submit(sv1.migrate, target=target)
+
+            try:
+                deadline = time.monotonic() + _BACKGROUND_TIMEOUT
+                while not reached_wait_point.wait(timeout=0.1):
+                    if first_migration.done():
+                        # Re-raise the error of the migration, if any.
+                        first_migration.result()
+                        pytest.fail('background migration finished before reaching the wait point')
+                    if time.monotonic() > deadline:
+                        pytest.fail('timed out waiting for the background migration')
+
+                yield sv2, appstate
+            except BaseException:
+                # Let the background migration finish, but do not let its
+                # error, if any, hide the one that is being raised.
+                finished_test.set()
+                concurrent.futures.wait([first_migration], timeout=_BACKGROUND_TIMEOUT)
+                raise
+            else:
+                finished_test.set()
+                first_migration.result(timeout=_BACKGROUND_TIMEOUT)
+    return factory
 
-        reached_wait_point.wait()
 
-        try:
-            yield sv2, appstate
-        finally:
-            finished_test.set()
-            first_migration_thread.join()
-    return factory
+@pytest.fixture(scope='session')
+def cli_parser():
+    """
+    Parser for the subcommands of `svip.cli.CLI`, created once for the whole
+    session. Tests that only need to check how command lines are parsed can
+    use it instead of creating `CLI` objects.
+    """
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers()
+    svip.cli.CLI.SD.create_parsers(subparsers)
+    return parser
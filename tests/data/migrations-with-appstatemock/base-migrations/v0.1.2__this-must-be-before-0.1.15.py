@@ -1,13 +1,9 @@
 # SPDX-License-Identifier: MPL-2.0
 def up(self):
     appstate = self.ctx['appstate']
-    data = appstate.get_data() or []
-    data.append('up to v0.1.2')
-    appstate.set_data(data)
+    appstate.append_to_data('up to v0.1.2')
 
 
 def down(self):
     appstate = self.ctx['appstate']
-    data = appstate.get_data() or []
-    data.append('down from v0.1.2')
-    appstate.set_data(data)
+    appstate.append_to_data('down from v0.1.2')
@@ -7,6 +7,4 @@ def up(self):
         has_finished_test = finished_test.wait(1)
         if not has_finished_test:
             raise RuntimeError('finished_test event not set: you should wrap the test code in a "try" block and set the event and join the thread in the "finally" clause')
-    data = appstate.get_data() or []
-    data.append('up to v1.3.0')
-    appstate.set_data(data)
+    appstate.append_to_data('up to v1.3.0')
@@ -2,17 +2,22 @@
 import svip
 
 
+# Names of the abstract methods of AppStateBackend
+_ABSTRACT_METHODS = tuple(
+    k for k, v in vars(svip.appstate.AppStateBackend).items()
+    if k[0].isalpha() and getattr(v, '__isabstractmethod__', False)
+)
+
+
+def _noop(self, *k, **kw):
+    return None
+
+
 # A dummy subclass with an empty implementation of each abstract method
 AppStateDummy = type(
     'AppStateDummy',
     (svip.AppStateBackend,),
-    {
-        name: lambda self, *k, **kw: None
-        for name in (
-            k for k, v in vars(svip.appstate.AppStateBackend).items()
-            if k[0].isalpha() and getattr(v, '__isabstractmethod__', False)
-        )
-    },
+    {name: _noop for name in _ABSTRACT_METHODS},
 )
 
 
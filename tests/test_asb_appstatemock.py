@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: MPL-2.0
 import pytest
+import semantic_version as semver
 
 import appstatemock
 import asb_testing
@@ -10,3 +11,24 @@ def asb():
     return appstatemock.AppStateMock().asb
 
 globals().update(asb_testing.generate_tests('appstatemock'))
+
+
+def test_backup_isolation():
+    mock = appstatemock.AppStateMock()
+    asb = mock.asb
+    mock.set_data(['before backup'])
+    asb.set_version(semver.Version('0.0.0'), semver.Version('0.0.1'))
+    asb.set_version(semver.Version('0.0.1'), None)
+    saved_snapshot = mock.get_snapshot()
+
+    bkp = asb.backup(None)
+
+    for _ in range(2):
+        mock.set_data(['after backup'])
+        asb.set_version(semver.Version('0.0.1'), semver.Version('0.0.2'))
+        asb.set_version(semver.Version('0.0.2'), None)
+        asb.register_inconsistency('foo', 'bar')
+
+        bkp.restore()
+        assert mock.get_snapshot() == saved_snapshot
+        assert len(asb.get_version_history()) == 1
@@ -1,9 +1,14 @@
 # SPDX-License-Identifier: MPL-2.0
+import concurrent.futures
+import contextlib
 import datetime
 import itertools
+import json
+import os
 import pathlib
+import queue
 import re
-import subprocess
+import time
 
 import pytest
 import semantic_version as semver
@@ -12,78 +17,272 @@ import asb_testing
 import svip.migration
 
 
-# The ASB for mongo depends on pymongo to be available.
-pytest.importorskip('pymongo')
+_V000 = semver.Version('0.0.0')
+_V001 = semver.Version('0.0.1')
 
-# Skip if docker is not available
-try:
-    subprocess.run(['docker', 'ps'], stdout=None, check=True)
-except:
-    pytest.skip('docker command is not available', allow_module_level=True)
 
+@pytest.fixture(scope='session')
+def docker_client():
+    """
+    Fixture that provides a docker client. Tests using it are skipped if the
+    docker daemon is not available.
 
-# If we got here, we know that we can import pytest_mongo
-import pytest_mongo.executor_noop
-import pytest_mongo.factories
+    Checking requirements here instead of when importing this module avoids
+    the checks when no test of this module is selected.
+    """
+    # The mongo service is run in a docker container, which is managed with
+    # the docker SDK.
+    docker = pytest.importorskip('docker')
 
+    try:
+        client = docker.from_env()
+        client.ping()
+    except:
+        pytest.skip('docker daemon is not available')
 
-@pytest.fixture(scope='session')
-def mongo_service():
+    try:
+        yield client
+    finally:
+        client.close()
+
+
+def start_mongo_container(docker_client):
     """
-    Fixture that starts a mongo service and yields useful information in a
-    dictionary.
+    Start a mongo container and return useful information in a dictionary.
     """
-    container_id = subprocess.run(
-        ['docker', 'run', '--rm', '-d', '-p', '27017', 'mongo:4'],
-        check=True,
-        stdout=subprocess.PIPE,
-        text=True,
-    ).stdout.strip()
+    container = docker_client.containers.run(
+        'mongo:4',
+        detach=True,
+        remove=True,
+        ports={'27017/tcp': None},
+    )
 
     try:
-        # Get published port
-        port_lines = subprocess.run(
-            ['docker', 'container', 'port', container_id, '27017/tcp'],
-            stdout=subprocess.PIPE,
-            text=True,
-        ).stdout.splitlines()
+        published = get_published_port(container)
+    except:
+        container.kill()
+        raise
 
-        ip, port = port_lines[0].rsplit(':')
+    host = published['HostIp']
+    if host == '0.0.0.0':
+        host = '127.0.0.1'
 
-        info = {
-            'exec_prefix': ['docker', 'exec', '-i', container_id],
-            'host': ip,
-            'port': int(port),
-        }
+    return {
+        'container_id': container.id,
+        'exec_prefix': ['docker', 'exec', '-i', container.id],
+        'host': host,
+        'port': int(published['HostPort']),
+    }
+
+
+def get_published_port(container, timeout=30):
+    """
+    Return the IPv4 binding of the published port 27017 of `container`.
+
+    The binding might not be available right after the container is started,
+    so the container's information is reloaded until it is.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        container.reload()
+        for binding in container.ports.get('27017/tcp') or ():
+            if ':' not in binding['HostIp']:
+                return binding
+        if time.monotonic() > deadline:
+            raise RuntimeError(f'port 27017 of container {container.id} was not published')
+        time.sleep(0.1)
+
+
+def kill_mongo_container(docker_client, container_id):
+    docker_client.containers.get(container_id).kill()
+
+
+@contextlib.contextmanager
+def shared_mongo_container(docker_client, root_tmp):
+    """
+    Context manager that provides a mongo container shared by all pytest-xdist
+    workers.
+
+    The first worker to get here starts the container and stores its
+    information in a file in `root_tmp`, which is shared by all workers. The
+    file also counts how many workers are using the container, so that the
+    last one to finish kills it.
+    """
+    import filelock
 
+    info_path = root_tmp / 'svip-mongo-service.json'
+    lock = filelock.FileLock(str(root_tmp / 'svip-mongo-service.json.lock'))
+
+    with lock:
+        if info_path.exists():
+            info = json.loads(info_path.read_text())
+        else:
+            info = start_mongo_container(docker_client)
+            info['users'] = 0
+        info['users'] += 1
+        info_path.write_text(json.dumps(info))
+
+    try:
         yield info
     finally:
-        subprocess.run(
-            ['docker', 'kill', container_id],
-            check=True,
-            stdout=subprocess.DEVNULL,
-        )
+        with lock:
+            info = json.loads(info_path.read_text())
+            info['users'] -= 1
+            if info['users']:
+                info_path.write_text(json.dumps(info))
+            else:
+                info_path.unlink()
+                kill_mongo_container(docker_client, info['container_id'])
 
 
-# NOTE:
-#  Overriding mongo_noproc and using duck-typing here in order to provide the
-#  TCP port exported by docker to pytest-mongo at runtime. Let's keep an eye on
-#  https://github.com/ClearcodeHQ/pytest-mongo/issues/308 . If the feature
-#  proposed there is implemented, then we can provide the configuration in a
-#  proper way.
 @pytest.fixture(scope='session')
-def mongo_noproc(mongo_service):
-    yield pytest_mongo.executor_noop.NoopExecutor(
+def mongo_service(docker_client, tmp_path_factory):
+    """
+    Fixture that starts a mongo service and yields useful information in a
+    dictionary.
+
+    When running with pytest-xdist, a single service is shared by all
+    workers.
+    """
+    # The ASB for mongo depends on pymongo to be available, so there is no
+    # point in starting the service otherwise.
+    pytest.importorskip('pymongo')
+
+    if os.environ.get('PYTEST_XDIST_WORKER'):
+        # The parent of the base temporary directory is shared by all
+        # workers.
+        root_tmp = tmp_path_factory.getbasetemp().parent
+        with shared_mongo_container(docker_client, root_tmp) as info:
+            yield info
+    else:
+        info = start_mongo_container(docker_client)
+        try:
+            yield info
+        finally:
+            kill_mongo_container(docker_client, info['container_id'])
+
+
+@pytest.fixture(scope='session')
+def mongo_client(mongo_service):
+    """
+    Fixture that provides a client connected to the mongo service, shared by
+    all tests.
+    """
+    import pymongo
+
+    client = pymongo.MongoClient(
         host=mongo_service['host'],
         port=mongo_service['port'],
     )
+    try:
+        yield client
+    finally:
+        client.close()
 
 
-mongo_connection = pytest_mongo.factories.mongodb('mongo_noproc')
+class MongoDatabasePool:
+    """
+    A pool of names of empty databases.
+
+    Released databases are dropped in a background thread and only then
+    become available again, so that tests do not need to wait for the drop.
+    A database that could not be dropped is not put back into the pool; the
+    error is raised by the next call to `get()` instead.
+    """
+
+    def __init__(self, client, executor, size=32, timeout=30):
+        self.__client = client
+        self.__executor = executor
+        self.__timeout = timeout
+        self.__names = queue.Queue()
+        # Errors are put here by the threads of the executor.
+        self.__drop_errors = queue.Queue()
+        # The mongo service is shared by pytest-xdist workers, so the id of
+        # the worker is used to avoid collisions.
+        worker_id = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+        for i in range(size):
+            self.__names.put(f'svip_test_{worker_id}_{i}')
+
+    def get(self) -> str:
+        self.__raise_drop_error()
+        try:
+            return self.__names.get(timeout=self.__timeout)
+        except queue.Empty:
+            self.__raise_drop_error()
+            pytest.fail('timed out waiting for a database from the pool')
+
+    def release(self, db_name: str):
+        self.__executor.submit(self.__drop_and_put, db_name)
+
+    def __drop_and_put(self, db_name):
+        try:
+            self.__client.drop_database(db_name)
+        except Exception as e:
+            self.__drop_errors.put((db_name, e))
+        else:
+            self.__names.put(db_name)
+
+    def __raise_drop_error(self):
+        try:
+            db_name, e = self.__drop_errors.get_nowait()
+        except queue.Empty:
+            return
+        raise RuntimeError(f'failed to drop database {db_name}') from e
+
+
+class FailingDropClient:
+    """
+    Stand-in for a mongo client whose ``drop_database()`` always fails.
+    """
+
+    def drop_database(self, db_name):
+        raise Exception(f'cannot drop {db_name}')
+
+
+def test_mongo_db_pool_drop_error():
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        pool = MongoDatabasePool(FailingDropClient(), executor, size=1, timeout=0.1)
+        db_name = pool.get()
+        pool.release(db_name)
+
+    # The executor was shut down, so the drop has already been attempted.
+    with pytest.raises(RuntimeError, match=f'^failed to drop database {db_name}$'):
+        pool.get()
+
+
+def test_mongo_db_pool_timeout():
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        pool = MongoDatabasePool(FailingDropClient(), executor, size=1, timeout=0.1)
+        pool.get()
+        with pytest.raises(pytest.fail.Exception, match='^timed out waiting'):
+            pool.get()
+
+
+@pytest.fixture(scope='session')
+def mongo_db_pool(mongo_client):
+    """
+    Fixture that provides a `MongoDatabasePool`. Pending drops are waited for
+    at the end of the session.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        yield MongoDatabasePool(mongo_client, executor)
 
 
 @pytest.fixture
-def asb_factory(tmp_path, mongo_connection, mongo_service):
+def mongo_db(mongo_client, mongo_db_pool):
+    """
+    Fixture that provides a database exclusive to the test, which is dropped
+    after the test.
+    """
+    db_name = mongo_db_pool.get()
+    try:
+        yield mongo_client.get_database(db_name)
+    finally:
+        mongo_db_pool.release(db_name)
+
+
+@pytest.fixture
+def asb_factory(tmp_path, mongo_db, mongo_service):
     import svip.asb.mongo
 
     counter = itertools.count()
@@ -96,7 +295,7 @@ def asb_factory(tmp_path, mongo_connection, mongo_service):
                 cli_restore_prefix=mongo_service['exec_prefix'] + ['mongorestore'],
                 cli_connection_options=[],
             ),
-            db=mongo_connection.get_database('foo'),
+            db=mongo_db,
         )
 
     yield asb
@@ -107,11 +306,88 @@ def asb(asb_factory):
     yield asb_factory()
 
 
+class FakeContainer:
+    """
+    Stand-in for a container object of the docker SDK, used to test the
+    management of the mongo container without a docker daemon. The port is
+    only published after `reloads_until_published` calls to `reload()`.
+    """
+
+    def __init__(self, container_id, reloads_until_published=0):
+        self.id = container_id
+        self.ports = {}
+        self.killed = False
+        self.__reloads_until_published = reloads_until_published
+
+    def reload(self):
+        if self.__reloads_until_published:
+            self.__reloads_until_published -= 1
+        else:
+            self.ports = {
+                '27017/tcp': [
+                    {'HostIp': '0.0.0.0', 'HostPort': '49153'},
+                    {'HostIp': '::', 'HostPort': '49153'},
+                ],
+            }
+
+    def kill(self):
+        self.killed = True
+
+
+class FakeDockerClient:
+    def __init__(self, reloads_until_published=0):
+        self.containers = self
+        self.started = []
+        self.__reloads_until_published = reloads_until_published
+
+    def run(self, image, **kw):
+        container = FakeContainer(
+            f'container-{len(self.started)}',
+            self.__reloads_until_published,
+        )
+        self.started.append(container)
+        return container
+
+    def get(self, container_id):
+        for container in self.started:
+            if container.id == container_id:
+                return container
+        raise KeyError(container_id)
+
+
+def test_start_mongo_container_waits_for_port():
+    client = FakeDockerClient(reloads_until_published=3)
+    info = start_mongo_container(client)
+    assert info['host'] == '127.0.0.1'
+    assert info['port'] == 49153
+    assert info['container_id'] == 'container-0'
+
+
+def test_shared_mongo_container_killed_by_last_user(tmp_path):
+    pytest.importorskip('filelock')
+    client = FakeDockerClient()
+
+    # Nested contexts simulate two pytest-xdist workers using the service.
+    with shared_mongo_container(client, tmp_path) as info1:
+        with shared_mongo_container(client, tmp_path) as info2:
+            assert info1['container_id'] == info2['container_id']
+        assert len(client.started) == 1
+        assert not client.started[0].killed
+
+    assert client.started[0].killed
+    assert not (tmp_path / 'svip-mongo-service.json').exists()
+
+
 def test_data_already_initialized(asb_factory):
     asb1 = asb_factory()
     asb2 = asb_factory()
 
 
+_DUPLICATE_BACKUP_RE = re.compile(
+    r'^refusing to do backup: path .*-svip-mongo-asb-backup\.gz exists$'
+)
+
+
 @pytest.mark.parametrize(
     'with_migration,with_cli_auth',
     [
@@ -123,59 +399,60 @@ def test_data_already_initialized(asb_factory):
 def test_backup_info(asb, with_migration, with_cli_auth):
     if with_migration == 'with_migration':
         migration_info = svip.migration.MigrationInfo(
-            current=semver.Version('0.0.0'),
-            target=semver.Version('0.0.1'),
+            current=_V000,
+            target=_V001,
         )
     else:
         migration_info = None
 
     bkp = asb.backup(migration_info)
 
-
     if with_cli_auth == 'with_cli_auth':
         bkp._MongoASBBackup__conf.cli_authentication_options = ['foo', 'bar']
 
     bkp_info = bkp.info()
 
-    if migration_info:
-        expected_pattern = '^backup is at: .*$'
-    else:
-        expected_pattern = (
-            r'^backup is at: .+\n'
-            r'you can pass it as the standard input to the following '
-            r'command to restore the backup:\n'
-            r'    .*mongorestore '
-        )
-        if with_cli_auth == 'with_cli_auth':
-            expected_pattern += r'.*MASKED_AUTH_OPTIONS '
-        expected_pattern += r'.*--drop --gzip --archive$'
-
-    assert re.match(expected_pattern, bkp_info)
+    lines = bkp_info.split('\n')
+    assert lines[0].startswith('backup is at: ')
+    assert len(lines[0]) > len('backup is at: ')
 
+    if migration_info:
+        assert len(lines) == 1
+        return
 
-def test_duplicate_backup_output(asb, monkeypatch):
-    migration_info = svip.migration.MigrationInfo(
-        current=semver.Version('0.0.0'),
-        target=semver.Version('0.0.1'),
+    assert len(lines) == 3
+    assert lines[1] == (
+        'you can pass it as the standard input to the following command to '
+        'restore the backup:'
     )
 
-    # Let's mock datetime.datetime to return always the same value for utcnow()
-    # since the backup filename is generated using that function.
-    class MockedDatetime:
-        fixed_now = datetime.datetime.utcnow()
+    cmd = lines[2]
+    assert cmd.startswith('    ')
+    assert cmd.endswith(' --drop --gzip --archive')
+    _, sep, cmd_args = cmd.partition('mongorestore ')
+    assert sep
+    if with_cli_auth == 'with_cli_auth':
+        assert ' MASKED_AUTH_OPTIONS ' in cmd_args
+    else:
+        assert 'MASKED_AUTH_OPTIONS' not in cmd_args
 
-        @staticmethod
-        def utcnow():
-            return MockedDatetime.fixed_now
 
-    monkeypatch.setattr(datetime, 'datetime', MockedDatetime)
+def test_duplicate_backup_output(asb):
+    time_machine = pytest.importorskip('time_machine')
 
-    first_bkp = asb.backup(migration_info)
-    with pytest.raises(
-        RuntimeError,
-        match=r'^refusing to do backup: path .*-svip-mongo-asb-backup\.gz exists$',
-    ):
-        second_bkp = asb.backup(migration_info)
+    migration_info = svip.migration.MigrationInfo(
+        current=_V000,
+        target=_V001,
+    )
 
+    # Let's freeze the time, since the backup filename is generated from the
+    # current time.
+    with time_machine.travel(datetime.datetime.utcnow(), tick=False):
+        first_bkp = asb.backup(migration_info)
+        with pytest.raises(
+            RuntimeError,
+            match=_DUPLICATE_BACKUP_RE,
+        ):
+            second_bkp = asb.backup(migration_info)
 
 globals().update(asb_testing.generate_tests('mongo', supports_transaction=False))
@@ -8,18 +8,61 @@ import asb_testing
 import svip.migration
 
 
+_V000 = semver.Version('0.0.0')
+_V001 = semver.Version('0.0.1')
+
+
+@pytest.fixture(scope='session')
+def sqlite_template():
+    """
+    An in-memory database already containing the versioning table, so that
+    tests do not need to create it themselves.
+    """
+    import svip.asb.sqlite
+
+    conn = sqlite3.connect(":memory:")
+    try:
+        # The versioning table is created on demand by set_version(), before
+        # its conditions are checked. Setting the initial version again is
+        # rejected, so the table is created with its initial row untouched.
+        asb = svip.asb.sqlite.SqliteASB(conn, svip.asb.sqlite.SqliteASBConf())
+        assert asb.set_version(_V000, None) == (False, _V000, None)
+        yield conn
+    finally:
+        conn.close()
+
+
 @pytest.fixture
-def asb(tmp_path):
+def asb(tmp_path, sqlite_template):
     import svip.asb.sqlite
 
     conf = svip.asb.sqlite.SqliteASBConf(backups_dir=tmp_path / "backups")
     conn = sqlite3.connect(":memory:")
     try:
+        sqlite_template.backup(conn)
         yield svip.asb.sqlite.SqliteASB(conn, conf)
     finally:
         conn.close()
 
 
+def test_fresh_database(tmp_path):
+    import svip.asb.sqlite
+
+    # The asb fixture starts from a database that already contains the
+    # versioning table, so let's make sure that the ASB also works on an empty
+    # one.
+    conf = svip.asb.sqlite.SqliteASBConf(backups_dir=tmp_path / "backups")
+    conn = sqlite3.connect(":memory:")
+    try:
+        asb = svip.asb.sqlite.SqliteASB(conn, conf)
+        assert asb.get_state() == (None, _V000, None)
+        result = asb.set_version(_V000, _V001)
+        assert result == (True, _V000, None)
+        assert asb.get_version() == (_V000, _V001)
+    finally:
+        conn.close()
+
+
 @pytest.mark.parametrize(
     'with_migration',
     ['with_migration', 'without_migration'],
@@ -27,8 +70,8 @@ def asb(tmp_path):
 def test_backup(asb, with_migration):
     if with_migration == 'with_migration':
         migration_info = svip.migration.MigrationInfo(
-            current=semver.Version('0.0.0'),
-            target=semver.Version('0.0.1'),
+            current=_V000,
+            target=_V001,
         )
     else:
         migration_info = None
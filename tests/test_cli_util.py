@@ -1,6 +1,8 @@
 # SPDX-License-Identifier: MPL-2.0
 import argparse
 
+import pytest
+
 from svip import cli_util
 
 
@@ -13,7 +15,12 @@ def test_bool_action():
     assert parser.parse_args([]) == argparse.Namespace(foo=None)
 
 
-def test_command_decorator(svip_factory):
+@pytest.fixture(scope='module')
+def decorated_parser():
+    """
+    Fixture that provides a parser created with `cli_util.SubcommandDecorator`
+    and a dict mapping names to the decorated functions.
+    """
     sd = cli_util.SubcommandDecorator()
 
     @sd.cmd()
@@ -44,36 +51,36 @@ def test_command_decorator(svip_factory):
     subparsers = parser.add_subparsers()
     sd.create_parsers(subparsers)
 
-    args = parser.parse_args(['foo'])
-    expected_args = argparse.Namespace(
-        fn=foo,
-    )
-    assert args == expected_args
-
-    args = parser.parse_args(['two-words'])
-    expected_args = argparse.Namespace(
-        fn=two_words,
-    )
-    assert args == expected_args
-
-    args = parser.parse_args(['bar', '--option-for-bar', 'hello'])
-    expected_args = argparse.Namespace(
-        fn=bar,
-        option_for_bar='hello',
-        another_option_for_bar=None,
-    )
-    assert args == expected_args
-
-    args = parser.parse_args(['changed-name', '--option', 'hello'])
-    expected_args = argparse.Namespace(
-        fn=original_name,
-        option='hello',
-    )
-    assert args == expected_args
-
-    args = parser.parse_args(['changed-name-2'])
+    fns = {
+        fn.__name__: fn
+        for fn in (foo, two_words, bar, original_name, another_original_name)
+    }
+    return parser, fns
+
+
+@pytest.mark.parametrize(
+    'argv,fn_name,expected_options',
+    [
+        (['foo'], 'foo', {}),
+        (['two-words'], 'two_words', {}),
+        (
+            ['bar', '--option-for-bar', 'hello'],
+            'bar',
+            {'option_for_bar': 'hello', 'another_option_for_bar': None},
+        ),
+        (
+            ['changed-name', '--option', 'hello'],
+            'original_name',
+            {'option': 'hello'},
+        ),
+        (['changed-name-2'], 'another_original_name', {'option': None}),
+    ],
+)
+def test_command_decorator(decorated_parser, argv, fn_name, expected_options):
+    parser, fns = decorated_parser
+    args = parser.parse_args(argv)
     expected_args = argparse.Namespace(
-        fn=another_original_name,
-        option=None,
+        fn=fns[fn_name],
+        **expected_options,
     )
     assert args == expected_args
@@ -5,8 +5,11 @@ import semantic_version as semver
 import svip.migration
 
 
+_ANY_SPEC = semver.NpmSpec('*')
+
+
 def test_dir_with_helper_module(filenames_dir_factory):
     manager = svip.migration.MigrationManager(
         filenames_dir_factory('with-helper-module'),
     )
-    manager.get_latest_match(semver.NpmSpec('*'))
+    manager.get_latest_match(_ANY_SPEC)
@@ -6,6 +6,9 @@ import svip
 import svip.migration
 
 
+_ANY_SPEC = semver.NpmSpec('*')
+
+
 def test_not_found(filenames_dir_factory):
     manager = svip.migration.MigrationManager(filenames_dir_factory())
 
@@ -17,3 +20,36 @@ def test_not_found(filenames_dir_factory):
 
     matched = manager.get_latest_match(semver.NpmSpec('~0.1.2'))
     assert matched == semver.Version('0.1.15')
+
+
+def test_reload(filenames_dir_factory):
+    steps_dir = filenames_dir_factory()
+    manager = svip.migration.MigrationManager(steps_dir)
+
+    matched = manager.get_latest_match(_ANY_SPEC)
+    assert matched == semver.Version('2.65.921')
+
+    # Changes made by other means are only seen after a reload
+    (steps_dir / 'v3.0.0__added-externally.py').write_text('def up():\n    pass\n')
+    matched = manager.get_latest_match(_ANY_SPEC)
+    assert matched == semver.Version('2.65.921')
+
+    manager.reload()
+    matched = manager.get_latest_match(_ANY_SPEC)
+    assert matched == semver.Version('3.0.0')
+
+
+def test_new_step_script(filenames_dir_factory):
+    manager = svip.migration.MigrationManager(filenames_dir_factory())
+
+    matched = manager.get_latest_match(semver.NpmSpec('^2.0.0'))
+    assert matched == semver.Version('2.65.921')
+
+    _, new_version = manager.new_step_script(
+        'new step',
+        svip.migration.BumpType.MINOR,
+    )
+    assert new_version == semver.Version('2.66.0')
+
+    matched = manager.get_latest_match(semver.NpmSpec('^2.0.0'))
+    assert matched == semver.Version('2.66.0')
@@ -6,13 +6,17 @@ import svip
 import svip.migration
 
 
+_ANY_SPEC = semver.NpmSpec('*')
+_V000 = semver.Version('0.0.0')
+
+
 def test_upgrade(filenames_dir_factory):
     manager = svip.migration.MigrationManager(filenames_dir_factory())
 
-    versions = manager.get_versions(
-        current=semver.Version('0.0.0'),
+    versions = list(manager.get_versions(
+        current=_V000,
         target=semver.Version('2.65.921'),
-    )
+    ))
     expected_versions = [
         semver.Version('0.0.1'),
         semver.Version('0.0.2'),
@@ -23,10 +27,10 @@ def test_upgrade(filenames_dir_factory):
     ]
     assert versions == expected_versions
 
-    versions = manager.get_versions(
+    versions = list(manager.get_versions(
         current=semver.Version('0.1.0'),
         target=semver.Version('0.1.15'),
-    )
+    ))
     expected_versions = [
         semver.Version('0.1.2'),
         semver.Version('0.1.15'),
@@ -37,10 +41,10 @@ def test_upgrade(filenames_dir_factory):
 def test_downgrade(filenames_dir_factory):
     manager = svip.migration.MigrationManager(filenames_dir_factory())
 
-    versions = manager.get_versions(
+    versions = list(manager.get_versions(
         current=semver.Version('0.1.2'),
-        target=semver.Version('0.0.0'),
-    )
+        target=_V000,
+    ))
     expected_versions = [
         semver.Version('0.1.2'),
         semver.Version('0.1.0'),
@@ -49,10 +53,10 @@ def test_downgrade(filenames_dir_factory):
     ]
     assert versions == expected_versions
 
-    versions = manager.get_versions(
+    versions = list(manager.get_versions(
         current=semver.Version('0.1.15'),
         target=semver.Version('0.0.2'),
-    )
+    ))
     expected_versions = [
         semver.Version('0.1.15'),
         semver.Version('0.1.2'),
@@ -64,16 +68,16 @@ def test_downgrade(filenames_dir_factory):
 def test_no_op(filenames_dir_factory):
     manager = svip.migration.MigrationManager(filenames_dir_factory())
 
-    versions = manager.get_versions(
-        current=semver.Version('0.0.0'),
-        target=semver.Version('0.0.0'),
-    )
+    versions = list(manager.get_versions(
+        current=_V000,
+        target=_V000,
+    ))
     assert versions == []
 
-    versions = manager.get_versions(
+    versions = list(manager.get_versions(
         current=semver.Version('0.0.2'),
         target=semver.Version('0.0.2'),
-    )
+    ))
     assert versions == []
 
 
@@ -83,12 +87,12 @@ def test_version_not_found(filenames_dir_factory):
     with pytest.raises(svip.errors.VersionNotFoundError):
         manager.get_versions(
             current=semver.Version('3.4.1'),
-            target=semver.Version('0.0.0'),
+            target=_V000,
         )
 
     with pytest.raises(svip.errors.VersionNotFoundError):
         manager.get_versions(
-            current=semver.Version('0.0.0'),
+            current=_V000,
             target=semver.Version('0.1.1'),
         )
 
@@ -106,7 +110,7 @@ def test_empty_dir(tmp_path):
         # Testing with any version here. Just to make sure manager reads the
         # empty directory
         manager.get_versions(
-            current=semver.Version('0.0.0'),
+            current=_V000,
             target=semver.Version('1.0.0'),
         )
 
@@ -115,10 +119,10 @@ def test_partial_version_strings(filenames_dir_factory, datadir):
     manager = svip.migration.MigrationManager(
         filenames_dir_factory('partial-versions', inherit_from=None)
     )
-    versions = manager.get_versions(
-        current=semver.Version('0.0.0'),
-        target=manager.get_latest_match(semver.NpmSpec('*')),
-    )
+    versions = list(manager.get_versions(
+        current=_V000,
+        target=manager.get_latest_match(_ANY_SPEC),
+    ))
     expected_versions = [
         semver.Version('1.0.0'),
         semver.Version('2.0.0'),
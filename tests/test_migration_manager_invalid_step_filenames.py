@@ -5,6 +5,10 @@ import semantic_version as semver
 import svip
 import svip.migration
 
+
+_ANY_SPEC = semver.NpmSpec('*')
+
+
 @pytest.mark.parametrize(
     ['directory', 'error_class', 'error_match'],
     [
@@ -36,4 +40,4 @@ def test_invalid_step_filenames(filenames_dir_factory, directory, error_class, e
         error_class,
         match=error_match,
     ):
-        manager.get_latest_match(semver.NpmSpec('*'))
+        manager.get_latest_match(_ANY_SPEC)
@@ -4,6 +4,10 @@ import semantic_version as semver
 import svip.migration
 
 
+_ANY_SPEC = semver.NpmSpec('*')
+_V000 = semver.Version('0.0.0')
+
+
 def test_script_content(filenames_dir_factory):
     manager = svip.migration.MigrationManager(filenames_dir_factory())
     script_path, _ = manager.new_step_script(
@@ -33,11 +37,11 @@ def test_in_existing_dir(filenames_dir_factory):
     dir_path = filenames_dir_factory()
     manager = svip.migration.MigrationManager(dir_path)
 
-    latest_before_new_steps = manager.get_latest_match(semver.NpmSpec('*'))
-    versions_before_new_steps = manager.get_versions(
-        current=semver.Version('0.0.0'),
+    latest_before_new_steps = manager.get_latest_match(_ANY_SPEC)
+    versions_before_new_steps = list(manager.get_versions(
+        current=_V000,
         target=latest_before_new_steps,
-    )
+    ))
 
     script_path, version = manager.new_step_script(
         name='testing minor  bump',
@@ -63,12 +67,12 @@ def test_in_existing_dir(filenames_dir_factory):
     assert version == semver.Version('3.0.1')
     assert script_path.is_file()
 
-    assert manager.get_latest_match(semver.NpmSpec('*')) == semver.Version('3.0.1')
+    assert manager.get_latest_match(_ANY_SPEC) == semver.Version('3.0.1')
 
-    new_versions = manager.get_versions(
-        current=semver.Version('0.0.0'),
+    new_versions = list(manager.get_versions(
+        current=_V000,
         target=semver.Version('3.0.1'),
-    )
+    ))
     expected_new_versions = versions_before_new_steps + [
         semver.Version('2.66.0'),
         semver.Version('3.0.0'),
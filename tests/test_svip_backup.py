@@ -7,6 +7,10 @@ import pytest
 import svip
 
 
+# Tests in this module never change their migrations directories.
+pytestmark = pytest.mark.read_only_steps_dirs
+
+
 @pytest.mark.parametrize('verbose', ['verbose', 'non-verbose'])
 def test_backup(svip_factory, verbose):
     sv, _ = svip_factory()
@@ -1,9 +1,14 @@
 # SPDX-License-Identifier: MPL-2.0
 import pytest
+import semantic_version as semver
 
 import svip
 
 
+# Tests in this module never change their migrations directories.
+pytestmark = pytest.mark.read_only_steps_dirs
+
+
 def test_error_migration_in_progress(migration_in_progress_factory):
     with migration_in_progress_factory(target='2.65.921') as (sv, appstate):
         with pytest.raises(
@@ -26,15 +31,39 @@ def test_inconsistent_state(svip_factory):
     with pytest.raises(svip.errors.InconsistentStateError):
         sv.check('~2.0')
 
+    # The state is checked before the specification, so an inconsistent state
+    # is reported even if no specification is available.
+    with pytest.raises(svip.errors.InconsistentStateError):
+        sv.check()
+
 
 def test_incompatible_version(svip_factory):
     sv, appstate = svip_factory()
 
     sv.migrate(target='0.1.15')
 
-    with pytest.raises(svip.errors.IncompatibleVersionError):
+    with pytest.raises(
+        svip.errors.IncompatibleVersionError,
+        match=r'^version spec ~1\.0 is incompatible with current schema version 0\.1\.15$',
+    ) as exc_info:
         sv.check('~1.0')
 
+    assert str(exc_info.value.spec) == '~1.0'
+    assert str(exc_info.value.current) == '0.1.15'
+
+
+def test_incompatible_version_simple_spec(svip_factory):
+    sv, appstate = svip_factory()
+    sv.migrate(target='0.1.15')
+
+    # Simple specifications are matched internally by a lightweight object,
+    # but the error must still expose a semantic_version.NpmSpec.
+    with pytest.raises(svip.errors.IncompatibleVersionError) as exc_info:
+        sv.check('^1.0.0')
+
+    assert isinstance(exc_info.value.spec, semver.NpmSpec)
+    assert exc_info.value.spec == semver.NpmSpec('^1.0.0')
+
 
 def test_compatible_version(svip_factory):
     sv, appstate = svip_factory()
@@ -59,3 +88,24 @@ def test_req_in_constructor(svip_factory):
     sv.migrate(target='0.1.15')
 
     sv.check()
+
+
+@pytest.mark.parametrize('check_cache_ttl', [0, 3600])
+def test_check_cache(svip_factory, check_cache_ttl):
+    sv, appstate = svip_factory(conf_extra={'check_cache_ttl': check_cache_ttl})
+
+    sv.migrate(target='0.1.15')
+    sv.check('~0.1')
+
+    appstate.asb.register_inconsistency('foo', 'bar')
+
+    if check_cache_ttl:
+        # The previous successful result is reused...
+        sv.check('~0.1')
+        # ...but only for the same spec
+        with pytest.raises(svip.errors.InconsistentStateError):
+            sv.check('^0.1.2')
+        sv.invalidate_check_cache()
+
+    with pytest.raises(svip.errors.InconsistentStateError):
+        sv.check('~0.1')
@@ -8,6 +8,11 @@ import semantic_version as semver
 
 import svip
 
+
+# Tests in this module never change their migrations directories.
+pytestmark = pytest.mark.read_only_steps_dirs
+
+
 def test_exit_status(svip_factory):
     sv, appstate = svip_factory()
     cli = sv.cli()
@@ -124,3 +129,32 @@ def test_dryruns(svip_factory, argv, expected_call_data):
     call_data = cli.run(argv=argv, dryrun=True)
 
     assert call_data == expected_call_data
+
+
+@pytest.mark.parametrize('argv,expected_cmd,expected_options', [
+    (
+        ['migrate', '--target', '2.0.1', '--no-verbose'],
+        '__cmd_migrate',
+        {'target': semver.Version('2.0.1'), 'verbose': False},
+    ),
+    (
+        ['match', '--spec', '^2.0'],
+        '__cmd_match',
+        {'spec': semver.NpmSpec('^2.0')},
+    ),
+    (
+        ['steps', '--current', '0.0.1'],
+        '__cmd_steps',
+        {'current': semver.Version('0.0.1'), 'target': None},
+    ),
+    (
+        ['backup'],
+        '__cmd_backup',
+        {},
+    ),
+])
+def test_parse_args(cli_parser, argv, expected_cmd, expected_options):
+    args = cli_parser.parse_args(argv)
+    assert args.fn.__name__ == expected_cmd
+    for name, value in expected_options.items():
+        assert getattr(args, name) == value
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: MPL-2.0
+import itertools
+
+import pytest
+import semantic_version as semver
+
+import svip.svip
+
+
+VERSIONS = [
+    semver.Version(f'{major}.{minor}.{patch}{suffix}')
+    for major, minor, patch, suffix in itertools.product(
+        (0, 1, 2),
+        (0, 1, 2),
+        (0, 1, 2),
+        ('', '-alpha', '+build'),
+    )
+]
+
+
+@pytest.mark.parametrize('expression', [
+    f'{op}{major}.{minor}.{patch}'
+    for op, major, minor, patch in itertools.product(
+        ('', '~', '^'),
+        (0, 1),
+        (0, 1),
+        (0, 1),
+    )
+])
+def test_same_as_npm_spec(expression):
+    fast_spec = svip.svip._parse_spec(expression)
+    assert isinstance(fast_spec, svip.svip._FastSpec)
+    assert str(fast_spec) == expression
+
+    npm_spec = semver.NpmSpec(expression)
+    for v in VERSIONS:
+        assert fast_spec.match(v) == npm_spec.match(v), v
+
+
+@pytest.mark.parametrize('expression', [
+    '~1.0',
+    '>=1.2.3',
+    '1.2.3 - 2.0.0',
+    '1.2.x',
+    '^1.2.3-alpha',
+])
+def test_fallback_to_npm_spec(expression):
+    spec = svip.svip._parse_spec(expression)
+    assert isinstance(spec, semver.NpmSpec)
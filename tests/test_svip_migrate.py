@@ -8,6 +8,10 @@ import semantic_version as semver
 import svip
 
 
+# Tests in this module never change their migrations directories.
+pytestmark = pytest.mark.read_only_steps_dirs
+
+
 def test_migrate(svip_factory):
     sv, appstate = svip_factory()
     assert sv.current_version() == semver.Version('0.0.0')
@@ -75,6 +79,32 @@ def test_verbose(svip_factory, case):
     assert f.getvalue() == expected_output
 
 
+@pytest.mark.parametrize('case', ['verbose', 'non-verbose'])
+def test_backup_info_computed_once(svip_factory, monkeypatch, case):
+    sv, appstate = svip_factory(
+        dirs=['with-error-in-step'],
+        with_transaction=False,
+        fail_restore_backup=True,
+    )
+
+    info_calls = []
+    def info(backup):
+        info_calls.append(backup)
+        return 'backup info'
+    monkeypatch.setattr(svip.AppStateBackup, 'info', info)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with pytest.raises(svip.errors.RestoreFailedError):
+            sv.migrate(
+                target=semver.Version('2.65.921'),
+                verbose=case == 'verbose',
+            )
+
+    assert len(info_calls) == 1
+    _, backup_info = appstate.asb.get_inconsistency()
+    assert backup_info == 'backup info'
+
+
 def test_missing_target_argument(svip_factory):
     sv, appstate = svip_factory()
 
@@ -335,7 +365,7 @@ def test_error_during_migration(svip_factory, fail_restore_state):
         expected_match = (
             r'failed to run migration: error running upgrade step to 1\.3\.0: '
             r'Traceback \(most recent call last\):\n'
-            r'  File ".*/v1\.3__error-in-step.py", line 6, in up\n'
+            r'  File ".*/v1\.3__error-in-step.py", line 5, in up\n'
             r'    raise Exception\(\'exception in up\(\) on purpose\'\)\n'
             r'Exception: exception in up\(\) on purpose\n'
         )
@@ -373,7 +403,7 @@ def test_error_during_downgrade(svip_factory):
         match=(
             r'^failed to run migration: error running downgrade step from 1\.3\.0: '
             r'Traceback \(most recent call last\):\n'
-            r'  File ".*/v1\.3__error-in-step.py", line 14, in down\n'
+            r'  File ".*/v1\.3__error-in-step.py", line 11, in down\n'
             r'    raise Exception\(\'exception in down\(\) on purpose\'\)\n'
             r'Exception: exception in down\(\) on purpose\n$'
         ),